@@ -0,0 +1,45 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A small in-process LRU cache with a per-entry time to live.
+
+    Meant for hot, tiny result sets (e.g. autocomplete for short prefixes)
+    where even a round trip to the shared cache is too slow.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept.
+        timeout (float): Seconds after which an entry is considered stale.
+    """
+
+    def __init__(self, maxsize: int = 256, timeout: float = 60):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
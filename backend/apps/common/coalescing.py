@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from celery import Task
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Backends whose entries are not visible to other processes (or not kept at
+# all); a pending marker set by the web process would never be cleared by the
+# worker there.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class CoalescingTask(Task):
+    """
+    Celery task base that collapses repeated calls into a single execution.
+
+    ``delay_coalesced`` enqueues the task with a countdown of
+    ``coalesce_window`` seconds and records a pending marker in the cache;
+    identical calls made while the marker exists are dropped. The marker is
+    removed when the execution starts, so changes made while it runs schedule
+    one more execution and nothing is lost. Coalescing needs a cache shared
+    with the workers; with a process-local one (the LocMem fallback used
+    without ``REDIS_URL``) every call is enqueued as is.
+
+    Usage::
+
+        @shared_task(base=CoalescingTask)
+        def refresh_something(entity_id): ...
+
+        refresh_something.delay_coalesced(entity_id)
+    """
+
+    abstract = True
+    coalesce_window = None
+
+    def get_coalesce_window(self) -> int:
+        if self.coalesce_window is None:
+            return settings.TASK_COALESCE_WINDOW
+        return self.coalesce_window
+
+    def coalesce_key(self, args, kwargs) -> str:
+        # Arguments are rendered as the JSON the worker receives them from, so
+        # both sides agree on the key, then hashed: lists render with spaces
+        # and brackets, which are not valid in every cache backend's keys.
+        call = json.dumps([args, kwargs], sort_keys=True, default=str)
+        digest = hashlib.md5(call.encode()).hexdigest()
+        return f"coalesce:{self.name}:{digest}"
+
+    def delay_coalesced(self, *args, **kwargs):
+        """
+        Enqueue the task unless an identical call is already pending.
+
+        Returns:
+            AsyncResult | None: The scheduled task, or None when coalesced.
+        """
+
+        if isinstance(caches["default"], PROCESS_LOCAL_CACHES):
+            return self.apply_async(args, kwargs)
+
+        window = self.get_coalesce_window()
+        # The marker outlives the countdown in case the queue is backed up.
+        timeout = window + settings.TASK_COALESCE_MAX_DELAY
+        if not cache.add(self.coalesce_key(args, kwargs), True, timeout=timeout):
+            return None
+        return self.apply_async(args, kwargs, countdown=window)
+
+    def __call__(self, *args, **kwargs):
+        if not isinstance(caches["default"], PROCESS_LOCAL_CACHES):
+            cache.delete(self.coalesce_key(args, kwargs))
+        return super().__call__(*args, **kwargs)
@@ -0,0 +1,16 @@
+from autoslug import AutoSlugField
+
+
+class AllocatableSlugField(AutoSlugField):
+    """
+    ``AutoSlugField`` that can keep a slug allocated before the save.
+
+    Bulk writers that allocate unique slugs for a whole batch at once set
+    ``instance._slug_allocated = True``; ``pre_save`` then keeps the slug
+    instead of checking it with one query per instance.
+    """
+
+    def pre_save(self, instance, add):
+        if getattr(instance, "_slug_allocated", False):
+            return getattr(instance, self.attname)
+        return super().pre_save(instance, add)
@@ -0,0 +1,79 @@
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+def variant_name(name: str, width: int) -> str:
+    """
+    Storage name of the ``width`` pixels wide derivative of image ``name``.
+
+    Derivatives live next to the original, e.g. ``product_images/a.jpg`` gets
+    ``product_images/variants/a.jpg/320.webp``. The layout lets nginx fall back
+    to the original while a derivative has not been generated yet.
+    """
+
+    directory, filename = posixpath.split(name)
+    extension = settings.IMAGE_VARIANT_FORMAT.lower()
+    return posixpath.join(directory, "variants", filename, f"{width}.{extension}")
+
+
+def variant_urls(storage, name: str) -> dict[str, str] | None:
+    """
+    Map of width to derivative URL for image ``name``, suitable for ``srcset``.
+    """
+
+    if not name:
+        return None
+    return {
+        str(width): storage.url(variant_name(name, width))
+        for width in settings.IMAGE_VARIANT_WIDTHS
+    }
+
+
+def generate_variants(storage, name: str, overwrite: bool = False) -> list[str]:
+    """
+    Render the fixed-width derivatives of image ``name`` with Pillow.
+
+    Images are never upscaled: widths above the original are rendered at the
+    original size. Existing derivatives are kept unless ``overwrite`` is set.
+
+    Returns:
+        list[str]: Storage names of the derivatives written.
+    """
+
+    targets = {
+        width: variant_name(name, width) for width in settings.IMAGE_VARIANT_WIDTHS
+    }
+    if not overwrite:
+        targets = {
+            width: target
+            for width, target in targets.items()
+            if not storage.exists(target)
+        }
+    if not targets:
+        return []
+
+    with storage.open(name, "rb") as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    if original.mode not in ("RGB", "RGBA"):
+        mode = "RGBA" if "transparency" in original.info else "RGB"
+        original = original.convert(mode)
+
+    written = []
+    for width, target in sorted(targets.items()):
+        image = original.copy()
+        image.thumbnail((width, width * 10), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(
+            buffer,
+            format=settings.IMAGE_VARIANT_FORMAT,
+            quality=settings.IMAGE_VARIANT_QUALITY,
+        )
+        if storage.exists(target):
+            storage.delete(target)
+        written.append(storage.save(target, ContentFile(buffer.getvalue())))
+    return written
@@ -10,6 +10,12 @@ class GetOrNoneQuerySet(models.QuerySet):
         except self.model.DoesNotExist:
             return None
 
+    async def aget_or_none(self, **kwargs):
+        try:
+            return await self.aget(**kwargs)
+        except self.model.DoesNotExist:
+            return None
+
 
 class GetOrNoneManager(models.Manager):
 
@@ -19,6 +25,9 @@ class GetOrNoneManager(models.Manager):
     def get_or_none(self, **kwargs):
         return self.get_queryset().get_or_none(**kwargs)
 
+    async def aget_or_none(self, **kwargs):
+        return await self.get_queryset().aget_or_none(**kwargs)
+
 
 class IsDeletedQuerySet(GetOrNoneQuerySet):
     def delete(self, hard_delete=False):
@@ -1,6 +1,176 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
 
 
 class PageSizedPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class KeysetPagination(PageSizedPagination):
+    """
+    Cursor pagination over a unique ordering such as ``("-created_at", "-id")``.
+
+    Instead of ``OFFSET n LIMIT k`` every page is fetched with a row-value
+    predicate on the last seen position, so deep pages cost the same as the
+    first one and no ``COUNT(*)`` is needed. Cursors are opaque base64 tokens
+    carrying the ordering, the position and the direction.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None, ordering=None):
+        queryset = self._prepare(queryset, request, ordering)
+        return self._finalize(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None, ordering=None):
+        queryset = self._prepare(queryset, request, ordering)
+        return self._finalize([item async for item in queryset])
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def _prepare(self, queryset, request, ordering):
+        self.request = request
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(ordering or self.ordering)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        order = self.ordering
+        if self.reverse:
+            order = tuple(_invert(field) for field in order)
+        if self.position is not None:
+            queryset = queryset.filter(keyset_filter(order, self.position))
+        return queryset.order_by(*order)[: self.page_size + 1]
+
+    def _finalize(self, items):
+        has_more = len(items) > self.page_size
+        items = items[: self.page_size]
+        if self.reverse:
+            items.reverse()
+
+        first = self._position_of(items[0]) if items else None
+        last = self._position_of(items[-1]) if items else None
+        if self.reverse:
+            self.next_position = last if self.position is not None else None
+            self.previous_position = first if has_more else None
+        else:
+            self.next_position = last if has_more else None
+            self.previous_position = first if self.position is not None else None
+        return items
+
+    def _position_of(self, item):
+        names = [field.lstrip("-") for field in self.ordering]
+        if isinstance(item, dict):
+            return [item[name] for name in names]
+        return [getattr(item, name) for name in names]
+
+    def encode_cursor(self, position, reverse):
+        payload = {
+            "o": list(self.ordering),
+            "p": [_to_primitive(value) for value in position],
+            "r": reverse,
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("ascii")
+        token = base64.urlsafe_b64encode(raw).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            if payload["o"] != list(self.ordering):
+                raise ValueError("Cursor was issued for another ordering")
+            values = payload["p"]
+            if len(values) != len(self.ordering):
+                raise ValueError("Cursor position does not match the ordering")
+            position = [
+                self._to_python(field.lstrip("-"), value)
+                for field, value in zip(self.ordering, values)
+            ]
+            return position, bool(payload["r"])
+        except (
+            binascii.Error,
+            UnicodeError,
+            ValueError,
+            KeyError,
+            TypeError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _to_python(self, name, value):
+        try:
+            if name == "pk":
+                field = self.model._meta.pk
+            else:
+                field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. a search rank) are plain JSON numbers.
+            return value
+        return field.to_python(value)
+
+
+def _invert(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def keyset_filter(order, position):
+    """
+    Build the "after ``position``" predicate, honouring every column direction.
+
+    The lexicographic comparison expands to ``a > x OR (a = x AND b > y)``,
+    which PostgreSQL cannot turn into an index range bound on its own, so a
+    redundant ``a >= x`` is ANDed on: the index scan then starts at the
+    cursor instead of at the beginning of the index.
+    """
+    condition = None
+    for field, value in reversed(list(zip(order, position))):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        term = Q(**{f"{name}__{lookup}": value})
+        if condition is not None:
+            term |= Q(**{name: value}) & condition
+        condition = term
+
+    leading = order[0]
+    bound = "lte" if leading.startswith("-") else "gte"
+    return Q(**{f"{leading.lstrip('-')}__{bound}": position[0]}) & condition
+
+
+def _to_primitive(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
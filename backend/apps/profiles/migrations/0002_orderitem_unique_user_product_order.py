@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+# Merge rows where a cart or an order holds the same product more than once
+# into the most recent one, summing the quantities.
+RANKED = """
+WITH ranked AS (
+    SELECT
+        id,
+        row_number() OVER (
+            PARTITION BY user_id, product_id, order_id
+            ORDER BY created_at DESC, id DESC
+        ) AS position,
+        sum(quantity) OVER (PARTITION BY user_id, product_id, order_id) AS total
+    FROM profiles_orderitem
+)
+"""
+
+DEDUPLICATE = [
+    RANKED
+    + """
+    UPDATE profiles_orderitem AS o SET quantity = r.total
+    FROM ranked AS r
+    WHERE o.id = r.id AND r.position = 1 AND o.quantity <> r.total;
+    """,
+    RANKED
+    + """
+    DELETE FROM profiles_orderitem AS o
+    USING ranked AS r
+    WHERE o.id = r.id AND r.position > 1;
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEDUPLICATE, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='orderitem',
+            constraint=models.UniqueConstraint(fields=('user', 'product', 'order'), name='unique_user_product_order', nulls_distinct=False),
+        ),
+    ]
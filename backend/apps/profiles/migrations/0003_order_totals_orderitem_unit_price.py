@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+# Existing orders only know today's prices, so those are frozen as the best
+# available snapshot.
+BACKFILL = [
+    """
+    UPDATE profiles_orderitem AS i SET unit_price = p.price_current
+    FROM shop_product AS p
+    WHERE i.product_id = p.id AND i.order_id IS NOT NULL;
+    """,
+    """
+    UPDATE profiles_order AS o SET subtotal = t.subtotal, total = t.subtotal
+    FROM (
+        SELECT order_id, sum(unit_price * quantity) AS subtotal
+        FROM profiles_orderitem
+        WHERE order_id IS NOT NULL
+        GROUP BY order_id
+    ) AS t
+    WHERE o.id = t.order_id;
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_orderitem_unique_user_product_order'),
+        ('shop', '0009_review_live_product_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
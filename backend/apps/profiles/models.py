@@ -67,6 +67,8 @@ class Order(BaseModel):
         tx_ref (str): The unique transaction reference.
         delivery_status (str): The delivery status of the order.
         payment_status (str): The payment status of the order.
+        subtotal (Decimal): Sum of the item totals at checkout.
+        total (Decimal): Amount to pay, the subtotal as no fees apply yet.
 
     Methods:
         __str__():
@@ -95,6 +97,18 @@ class Order(BaseModel):
     country = models.CharField(max_length=100, null=True)
     zipcode = models.CharField(max_length=6, null=True)
 
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of order history, per buyer and for sellers.
+            models.Index(
+                fields=["user", "created_at", "id"], name="order_user_created_idx"
+            ),
+            models.Index(fields=["created_at", "id"], name="order_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.full_name}'s order"
 
@@ -112,7 +126,8 @@ class OrderItem(BaseModel):
         order (ForeignKey): The order to which this item belongs.
         product (ForeignKey): The product associated with this order item.
         quantity (int): The quantity of the product ordered.
-
+        unit_price (Decimal): The product price at checkout, unset while the
+            item is in a cart.
 
     """
 
@@ -126,24 +141,25 @@ class OrderItem(BaseModel):
     )
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
 
     @property
     def get_total(self):
+        if self.unit_price is not None:
+            return self.unit_price * self.quantity
         return self.product.price_current * self.quantity
 
-    @property
-    def get_cart_subtotal(self):
-        orderitems = self.orderitems.all()
-        total = sum([item.get_total for item in orderitems])
-        return total
-
-    @property
-    def get_cart_total(self):
-        total = self.get_cart_subtotal
-        return total
-
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            # One row per product in a user's cart (order NULL) and per order;
+            # lets cart writes upsert with ON CONFLICT.
+            models.UniqueConstraint(
+                fields=["user", "product", "order"],
+                name="unique_user_product_order",
+                nulls_distinct=False,
+            )
+        ]
 
     def __str__(self):
         return self.product.name
@@ -0,0 +1,45 @@
+from celery import shared_task
+
+from backend.apps.accounts.models import User
+from backend.apps.profiles.models import ShippingAddress
+from backend.apps.shop.carts import get_cart_storage
+from backend.apps.shop.checkout import (
+    CheckoutError,
+    OutOfStockError,
+    checkout_cart,
+    save_ticket,
+)
+
+
+@shared_task
+def place_queued_order(ticket: str, user_id: str, shipping_id: str) -> None:
+    """
+    Run a checkout queued by ``CheckoutView`` and record its outcome on the ticket.
+
+    Routed to the ``checkout`` queue, whose dedicated workers bound how many
+    checkouts hit the database at once. Unexpected errors mark the ticket
+    FAILED before propagating, so clients stop polling.
+    """
+    try:
+        outcome = run_checkout(user_id, shipping_id)
+    except Exception:
+        save_ticket(
+            ticket, user_id, "FAILED", message="Checkout failed, please try again"
+        )
+        raise
+    save_ticket(ticket, user_id, **outcome)
+
+
+def run_checkout(user_id: str, shipping_id: str) -> dict:
+    user = User.objects.get(pk=user_id)
+    shipping = ShippingAddress.objects.get_or_none(id=shipping_id)
+    if not shipping:
+        return {"status": "FAILED", "message": "No shipping address with that ID"}
+
+    try:
+        order = checkout_cart(get_cart_storage(user), shipping)
+    except OutOfStockError as exc:
+        return {"status": "FAILED", "message": str(exc), "in_stock": exc.shortages}
+    except CheckoutError as exc:
+        return {"status": "FAILED", "message": str(exc)}
+    return {"status": "PLACED", "order": order.tx_ref}
@@ -1 +1,66 @@
-# Create your tests here.
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from backend.apps.accounts.models import User
+from backend.apps.profiles.models import Order, OrderItem
+from backend.apps.shop.models import Category, Product
+
+
+class OrdersViewTests(TestCase):
+    url = "/profiles/orders/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            "Buyer", "One", "buyer@example.com", "password"
+        )
+        other = User.objects.create_user(
+            "Buyer", "Two", "other@example.com", "password"
+        )
+        category = Category.objects.create(name="Phones")
+        products = [
+            Product.objects.create(
+                name=f"Phone {index}",
+                desc="A phone.",
+                price_current=100,
+                category=category,
+            )
+            for index in range(3)
+        ]
+        for user in (cls.user, other):
+            for _ in range(5):
+                order = Order.objects.create(user=user, subtotal=300, total=300)
+                OrderItem.objects.bulk_create(
+                    OrderItem(user=user, order=order, product=product, unit_price=100)
+                    for product in products
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_are_one_query_whatever_the_page_size(self):
+        for page_size in (2, 5):
+            with self.subTest(page_size=page_size):
+                with self.assertNumQueries(1):
+                    response = self.client.get(self.url, {"page_size": page_size})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_cursor_page_is_one_query(self):
+        first = self.client.get(self.url, {"page_size": 2})
+        with self.assertNumQueries(1):
+            second = self.client.get(first.data["next"])
+        self.assertEqual(second.status_code, 200)
+
+        tx_refs = [order["tx_ref"] for order in first.data["results"]]
+        tx_refs += [order["tx_ref"] for order in second.data["results"]]
+        expected = Order.objects.filter(user=self.user).order_by("-created_at", "-id")
+        self.assertEqual(tx_refs, [order.tx_ref for order in expected[:4]])
+        self.assertIsNotNone(second.data["previous"])
+
+    def test_only_own_orders_with_stored_totals(self):
+        response = self.client.get(self.url, {"page_size": 100})
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(response.data["results"][0]["total"], "300.00")
+        self.assertIsNone(response.data["next"])
@@ -5,11 +5,13 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from backend.apps.common.paginations import KeysetPagination
 from backend.apps.common.permissions import IsOwner
 from backend.apps.common.utils import set_dict_attr
 from backend.apps.profiles.models import ShippingAddress, Order, OrderItem
 from backend.apps.profiles.serializers import ProfileSerializer
 from backend.apps.profiles.serializers import ShippingAddressSerializer
+from backend.apps.shop.schema_examples import CURSOR_PAGE_PARAMS
 from backend.apps.shop.serializers import CheckItemOrderSerializer, OrderSerializer
 
 tags = ["profiles"]
@@ -87,25 +89,28 @@ class ShippingAddressesViewSet(ModelViewSet):
 
 class OrdersView(APIView):
     serializer_class = OrderSerializer
+    pagination_class = KeysetPagination
 
     @extend_schema(
         operation_id="orders_view",
         summary="Orders Fetch",
         description="""
-            This endpoint returns all orders for a particular user.
+            This endpoint returns the orders of a particular user, newest
+            first, with cursor pagination (follow the next/previous links).
+            Totals are those stored at checkout, so a page is one query.
         """,
         tags=tags,
+        parameters=CURSOR_PAGE_PARAMS,
     )
     def get(self, request):
-        user = request.user
-        orders = (
-            Order.objects.filter(user=user)
-            .select_related("user")
-            .prefetch_related("orderitems", "orderitems__product")
-            .order_by("-created_at")
+        orders = Order.objects.filter(user=request.user).select_related("user")
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(orders, request)
+        serializer = self.serializer_class(page, many=True)
+        return Response(
+            data=paginator.get_paginated_data(serializer.data),
+            status=status.HTTP_200_OK,
         )
-        serializer = self.serializer_class(orders, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
 class OrderItemsView(APIView):
@@ -127,7 +132,7 @@ class OrderItemsView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
         order_items = OrderItem.objects.filter(order=order).select_related(
-            "product", "product__seller", "product__seller__user"
+            "product", "product__category", "product__seller", "product__seller__user"
         )
         serializer = self.serializer_class(order_items, many=True)
         return Response(data=serializer.data, status=status.HTTP_200_OK)
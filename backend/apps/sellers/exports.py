@@ -0,0 +1,97 @@
+import csv
+
+import orjson
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from backend.apps.profiles.models import OrderItem
+from backend.apps.shop.models import Product
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Output column -> lookup, in output order.
+PRODUCT_EXPORT_COLUMNS = {
+    "slug": "slug",
+    "name": "name",
+    "category_slug": "category__slug",
+    "price_current": "price_current",
+    "price_old": "price_old",
+    "in_stock": "in_stock",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+ORDER_EXPORT_COLUMNS = {
+    "tx_ref": "order__tx_ref",
+    "ordered_at": "order__created_at",
+    "delivery_status": "order__delivery_status",
+    "payment_status": "order__payment_status",
+    "product_slug": "product__slug",
+    "product_name": "product__name",
+    "quantity": "quantity",
+    "price": "unit_price",
+}
+
+
+class Echo:
+    """
+    File-like object whose ``write`` returns the value, for ``csv.writer``.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _default(value):
+    return str(value)
+
+
+async def stream_rows(queryset, columns: dict, file_format: str):
+    """
+    Encode the rows of ``queryset`` one at a time as NDJSON lines or CSV.
+
+    Rows are read with ``aiterator`` (a server-side cursor on PostgreSQL) as
+    tuples of the ``columns`` lookups, so memory does not grow with the
+    number of rows.
+    """
+
+    names = list(columns)
+    rows = queryset.values_list(*columns.values()).aiterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE
+    )
+    if file_format == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(names).encode()
+        async for row in rows:
+            yield writer.writerow(row).encode()
+    else:
+        async for row in rows:
+            yield orjson.dumps(
+                dict(zip(names, row)),
+                default=_default,
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+
+
+def export_response(queryset, columns: dict, file_format: str, filename: str):
+    response = StreamingHttpResponse(
+        stream_rows(queryset, columns, file_format),
+        content_type=EXPORT_FORMATS[file_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{file_format}"'
+    return response
+
+
+def seller_products_export(seller, file_format: str):
+    queryset = Product.objects.filter(seller=seller).order_by("created_at", "id")
+    return export_response(queryset, PRODUCT_EXPORT_COLUMNS, file_format, "products")
+
+
+def seller_orders_export(seller, file_format: str):
+    queryset = OrderItem.objects.filter(
+        product__seller=seller, order__isnull=False
+    ).order_by("order__created_at", "order_id", "id")
+    return export_response(queryset, ORDER_EXPORT_COLUMNS, file_format, "orders")
@@ -0,0 +1,221 @@
+import csv
+import io
+import json
+from functools import partial
+from itertools import islice
+
+from autoslug.utils import crop_slug
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from backend.apps.sellers.models import ProductImport
+from backend.apps.sellers.serializers import ProductImportRowSerializer
+from backend.apps.shop.caching import invalidate_product_listings
+from backend.apps.shop.listing import refresh_product_listings
+from backend.apps.shop.models import Category, Product
+from backend.apps.shop.tasks import generate_image_variants
+
+IMAGE_FIELDS = ("image1", "image2", "image3")
+# A chunk whose slugs were taken concurrently is retried with new slugs once.
+INSERT_ATTEMPTS = 2
+
+
+def read_csv(stream):
+    """
+    Yield ``(line, row)`` pairs from a CSV stream with a header line.
+    """
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, {
+            key: value for key, value in row.items() if key is not None
+        }
+
+
+def read_ndjson(stream):
+    """
+    Yield ``(line, row)`` pairs from a newline delimited JSON stream.
+
+    Lines that are not JSON objects are yielded as ``(line, None)``.
+    """
+
+    for line, text in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+def allocate_slugs(products: list[Product]) -> None:
+    """
+    Assign unique slugs to a batch of unsaved products with a single query.
+
+    Mirrors ``AutoSlugField`` (same slugify function, cropping and ``-2``,
+    ``-3`` suffixes) but fetches the colliding slugs of the whole batch at once
+    instead of querying the table for every product. The lookup is an
+    ``IN`` over the base slugs plus a prefix match per base for the suffixed
+    ones, both served by the slug indexes. The products are flagged so that
+    ``AllocatableSlugField`` keeps these slugs on insert.
+    """
+
+    field = Product._meta.get_field("slug")
+    bases = [
+        crop_slug(field, field.slugify(product.name) or Product._meta.model_name)
+        for product in products
+    ]
+    lookup = Q(slug__in=set(bases))
+    for base in set(bases):
+        if len(base) + 4 <= field.max_length:
+            lookup |= Q(slug__startswith=f"{base}{field.index_sep}")
+        else:
+            # The base is cropped to make room for the suffix.
+            lookup |= Q(slug__startswith=base[: field.max_length - 4])
+    taken = set(
+        Product.objects.unfiltered().filter(lookup).values_list("slug", flat=True)
+    )
+
+    for product, base in zip(products, bases):
+        slug, original, index = base, base, 1
+        while slug in taken:
+            index += 1
+            tail = len(field.index_sep) + len(str(index))
+            if field.max_length < len(original) + tail:
+                original = original[: field.max_length - tail]
+            slug = f"{original}{field.index_sep}{index}"
+        taken.add(slug)
+        product.slug = slug
+        product._slug_allocated = True
+
+
+class ProductImporter:
+    """
+    Streams the rows of a ``ProductImport`` into products, chunk by chunk.
+
+    Every row is validated on its own; invalid rows are reported with their
+    line number and skipped without aborting the upload. Categories are
+    resolved from one lookup, slugs are allocated per chunk and each chunk is
+    inserted with a single statement. Progress is saved after every chunk.
+    """
+
+    row_serializer_class = ProductImportRowSerializer
+
+    def __init__(self, product_import: ProductImport):
+        self.product_import = product_import
+        self.chunk_size = settings.PRODUCT_IMPORT_CHUNK_SIZE
+        self.max_errors = settings.PRODUCT_IMPORT_MAX_ERRORS
+        # A single serializer instance is reused to validate every row.
+        self.row_serializer = self.row_serializer_class()
+        self.categories = dict(Category.objects.values_list("slug", "id"))
+
+    def run(self) -> ProductImport:
+        product_import = self.product_import
+        product_import.status = "PROCESSING"
+        product_import.save(update_fields=["status", "updated_at"])
+        try:
+            with product_import.file.open("rb") as stream:
+                rows = READERS[product_import.file_format](stream)
+                while chunk := list(islice(rows, self.chunk_size)):
+                    self.import_chunk(chunk)
+                    self.save_progress()
+        except (UnicodeDecodeError, csv.Error) as exc:
+            self.add_error(None, {"file": [str(exc)]})
+            product_import.status = "FAILED"
+        except Exception:
+            product_import.status = "FAILED"
+            self.save_progress()
+            raise
+        else:
+            product_import.status = "DONE"
+        finally:
+            if product_import.created_rows:
+                invalidate_product_listings()
+        self.save_progress()
+        return product_import
+
+    def import_chunk(self, chunk) -> None:
+        products = []
+        lines = []
+        for line, row in chunk:
+            product = self.build_product(line, row)
+            if product is not None:
+                products.append(product)
+                lines.append(line)
+        self.product_import.processed_rows += len(chunk)
+        if not products:
+            return
+
+        for _ in range(INSERT_ATTEMPTS):
+            allocate_slugs(products)
+            try:
+                with transaction.atomic():
+                    # One INSERT: the slugs are kept as allocated, not looked
+                    # up again per product.
+                    Product.objects.bulk_create(products)
+                    refresh_product_listings(Q(id__in=[p.id for p in products]))
+            except IntegrityError as exc:
+                # Only a slug taken concurrently by another writer can get here.
+                error = exc
+            else:
+                break
+        else:
+            for line in lines:
+                self.add_error(line, {"non_field_errors": [str(error).strip()]})
+            return
+
+        self.product_import.created_rows += len(products)
+        for product in products:
+            field_names = [name for name in IMAGE_FIELDS if getattr(product, name)]
+            if field_names:
+                transaction.on_commit(
+                    partial(
+                        generate_image_variants.delay_coalesced,
+                        "shop.Product",
+                        str(product.id),
+                        field_names,
+                    )
+                )
+
+    def build_product(self, line, row) -> Product | None:
+        if row is None:
+            self.add_error(line, {"non_field_errors": ["Expected a JSON object."]})
+            return None
+        try:
+            data = self.row_serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            self.add_error(line, exc.detail)
+            return None
+        category_slug = data.pop("category_slug")
+        category_id = self.categories.get(category_slug)
+        if category_id is None:
+            self.add_error(line, {"category_slug": ["Category does not exist!"]})
+            return None
+        return Product(
+            **data, category_id=category_id, seller_id=self.product_import.seller_id
+        )
+
+    def add_error(self, line, errors) -> None:
+        if line is not None:
+            self.product_import.failed_rows += 1
+        if len(self.product_import.errors) < self.max_errors:
+            self.product_import.errors.append({"line": line, "errors": errors})
+
+    def save_progress(self) -> None:
+        self.product_import.save(
+            update_fields=[
+                "status",
+                "processed_rows",
+                "created_rows",
+                "failed_rows",
+                "errors",
+                "updated_at",
+            ]
+        )
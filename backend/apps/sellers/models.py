@@ -28,3 +28,49 @@ class Seller(BaseModel):
 
     def __str__(self):
         return f"Seller for {self.business_name}"
+
+
+PRODUCT_IMPORT_FORMAT_CHOICES = (
+    ("csv", "csv"),
+    ("ndjson", "ndjson"),
+)
+
+PRODUCT_IMPORT_STATUS_CHOICES = (
+    ("PENDING", "PENDING"),
+    ("PROCESSING", "PROCESSING"),
+    ("DONE", "DONE"),
+    ("FAILED", "FAILED"),
+)
+
+
+class ProductImport(BaseModel):
+    """
+    A bulk product upload by a seller and its progress.
+
+    Attributes:
+        seller (ForeignKey): The seller the products are created for.
+        file (FileField): The uploaded CSV or NDJSON file.
+        file_format (str): ``csv`` or ``ndjson``.
+        status (str): PENDING, PROCESSING, DONE or FAILED.
+        processed_rows (int): Rows read so far.
+        created_rows (int): Products created so far.
+        failed_rows (int): Rows rejected so far.
+        errors (list): Per-row errors as ``{"line": n, "errors": {...}}``,
+            capped at ``PRODUCT_IMPORT_MAX_ERRORS`` entries.
+    """
+
+    seller = models.ForeignKey(
+        Seller, on_delete=models.CASCADE, related_name="product_imports"
+    )
+    file = models.FileField(upload_to="product_imports/")
+    file_format = models.CharField(max_length=10, choices=PRODUCT_IMPORT_FORMAT_CHOICES)
+    status = models.CharField(
+        max_length=20, default="PENDING", choices=PRODUCT_IMPORT_STATUS_CHOICES
+    )
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"Product import {self.id} ({self.status})"
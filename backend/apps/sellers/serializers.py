@@ -1,5 +1,9 @@
 from rest_framework import serializers
 
+from backend.apps.sellers.models import PRODUCT_IMPORT_FORMAT_CHOICES
+
+IMPORT_FILE_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}
+
 
 class SellerSerializer(serializers.Serializer):
     business_name = serializers.CharField(max_length=255)
@@ -19,3 +23,75 @@ class SellerSerializer(serializers.Serializer):
     bank_routing_number = serializers.CharField(max_length=50)
 
     is_approved = serializers.BooleanField(read_only=True)
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk product import. Images are names of files already in
+    the media storage.
+    """
+
+    name = serializers.CharField(max_length=100)
+    desc = serializers.CharField()
+    price_current = serializers.DecimalField(max_digits=10, decimal_places=2)
+    category_slug = serializers.SlugField()
+    in_stock = serializers.IntegerField(min_value=0)
+    image1 = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    image2 = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    image3 = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+
+class CreateProductImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=PRODUCT_IMPORT_FORMAT_CHOICES, required=False
+    )
+
+    def validate(self, attrs):
+        if "file_format" not in attrs:
+            extension = attrs["file"].name.rsplit(".", 1)[-1].lower()
+            file_format = IMPORT_FILE_EXTENSIONS.get(extension)
+            if file_format is None:
+                raise serializers.ValidationError(
+                    {"file_format": ["Could not infer the format, pass file_format."]}
+                )
+            attrs["file_format"] = file_format
+        return attrs
+
+
+class ProductImportSerializer(serializers.Serializer):
+    id = serializers.UUIDField(read_only=True)
+    file_format = serializers.CharField(read_only=True)
+    status = serializers.CharField(read_only=True)
+    processed_rows = serializers.IntegerField(read_only=True)
+    created_rows = serializers.IntegerField(read_only=True)
+    failed_rows = serializers.IntegerField(read_only=True)
+    errors = serializers.JSONField(read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+
+
+class BulkProductUpdateListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        slugs = [row["slug"] for row in attrs]
+        if len(set(slugs)) != len(slugs):
+            raise serializers.ValidationError("Every slug may appear only once.")
+        return attrs
+
+
+class BulkProductUpdateSerializer(serializers.Serializer):
+    slug = serializers.SlugField()
+    price_current = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False
+    )
+    in_stock = serializers.IntegerField(min_value=0, required=False)
+
+    class Meta:
+        list_serializer_class = BulkProductUpdateListSerializer
+
+    def validate(self, attrs):
+        if "price_current" not in attrs and "in_stock" not in attrs:
+            raise serializers.ValidationError(
+                "Provide price_current, in_stock or both."
+            )
+        return attrs
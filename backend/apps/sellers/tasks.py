@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from backend.apps.sellers.imports import ProductImporter
+from backend.apps.sellers.models import ProductImport
+
+
+@shared_task
+def import_products(product_import_id: str) -> None:
+    """
+    Process a queued bulk product upload, saving progress after every chunk.
+    """
+    product_import = ProductImport.objects.select_related("seller").get_or_none(
+        id=product_import_id, status="PENDING"
+    )
+    if product_import is not None:
+        ProductImporter(product_import).run()
@@ -1 +1,180 @@
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from backend.apps.accounts.models import User
+from backend.apps.profiles.models import Order, OrderItem
+from backend.apps.sellers.imports import ProductImporter
+from backend.apps.sellers.models import ProductImport, Seller
+from backend.apps.shop.models import Category, Product
+
+
+def create_seller(email: str) -> Seller:
+    user = User.objects.create_user(
+        "Seller", "Shop", email, "password", account_type="SELLER"
+    )
+    return Seller.objects.create(
+        user=user,
+        business_name=f"Shop of {email}",
+        inn_identification_number="1234567890",
+        phone_number="0000000000",
+        business_description="A shop.",
+        business_address="Main street 1",
+        city="City",
+        postal_code="000000",
+        bank_name="Bank",
+        bank_bic_number="000000000",
+        bank_account_number="0000000000",
+        bank_routing_number="0000000000",
+        is_approved=True,
+    )
+
+
+class SellerOrdersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_seller("seller@example.com")
+        other_seller = create_seller("other-seller@example.com")
+        buyer = User.objects.create_user(
+            "Buyer", "One", "buyer@example.com", "password"
+        )
+        category = Category.objects.create(name="Phones")
+
+        def product(seller, index):
+            return Product.objects.create(
+                name=f"{seller.business_name} phone {index}",
+                desc="A phone.",
+                price_current=100,
+                category=category,
+                seller=seller,
+            )
+
+        own = [product(cls.seller, index) for index in range(5)]
+        foreign = product(other_seller, 0)
+
+        cls.orders = []
+        for _ in range(5):
+            order = Order.objects.create(user=buyer, subtotal=600, total=600)
+            OrderItem.objects.bulk_create(
+                OrderItem(user=buyer, order=order, product=item, unit_price=100)
+                for item in [*own, foreign]
+            )
+            cls.orders.append(order)
+        # Orders without any of the seller's products are not listed.
+        for _ in range(3):
+            order = Order.objects.create(user=buyer, subtotal=100, total=100)
+            OrderItem.objects.create(
+                user=buyer, order=order, product=foreign, unit_price=100
+            )
+
+    def client_for_seller(self) -> APIClient:
+        # A freshly loaded user, so IsSeller's seller lookup is counted.
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=self.seller.user_id))
+        return client
+
+    def test_orders_pages_are_two_queries_whatever_the_page_size(self):
+        for page_size in (2, 5):
+            with self.subTest(page_size=page_size):
+                client = self.client_for_seller()
+                with self.assertNumQueries(2):
+                    response = client.get("/sellers/orders/", {"page_size": page_size})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_orders_cursor_page_is_two_queries(self):
+        first = self.client_for_seller().get("/sellers/orders/", {"page_size": 2})
+        client = self.client_for_seller()
+        with self.assertNumQueries(2):
+            second = client.get(first.data["next"])
+        self.assertEqual(second.status_code, 200)
+
+        tx_refs = [order["tx_ref"] for order in first.data["results"]]
+        tx_refs += [order["tx_ref"] for order in second.data["results"]]
+        expected = sorted(
+            self.orders, key=lambda order: (order.created_at, order.id), reverse=True
+        )
+        self.assertEqual(tx_refs, [order.tx_ref for order in expected[:4]])
+
+    def test_order_items_pages_are_two_queries_whatever_the_page_size(self):
+        path = f"/sellers/orders/{self.orders[0].tx_ref}/"
+        for page_size in (2, 5):
+            with self.subTest(page_size=page_size):
+                client = self.client_for_seller()
+                with self.assertNumQueries(2):
+                    response = client.get(path, {"page_size": page_size})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_order_items_cursor_page_is_two_queries(self):
+        path = f"/sellers/orders/{self.orders[0].tx_ref}/"
+        first = self.client_for_seller().get(path, {"page_size": 3})
+        client = self.client_for_seller()
+        with self.assertNumQueries(2):
+            second = client.get(first.data["next"])
+        self.assertEqual(second.status_code, 200)
+
+        # Only the seller's own items, each once.
+        slugs = [item["product"]["slug"] for item in first.data["results"]]
+        slugs += [item["product"]["slug"] for item in second.data["results"]]
+        own = Product.objects.filter(seller=self.seller).values_list("slug", flat=True)
+        self.assertCountEqual(slugs, own)
+        self.assertIsNone(second.data["next"])
+
+    def test_order_items_of_unknown_order_are_an_empty_page(self):
+        response = self.client_for_seller().get("/sellers/orders/unknown/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [])
+        self.assertIsNone(response.data["next"])
+
+
+class ProductImportChunkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_seller("importer@example.com")
+        category = Category.objects.create(name="Lamps")
+        # Rivals for the allocated slugs, including a suffixed one.
+        for _ in range(2):
+            Product.objects.create(
+                name="Desk lamp", desc="A lamp.", price_current=10, category=category
+            )
+
+    def import_chunk(self, size):
+        importer = ProductImporter(
+            ProductImport(seller=self.seller, file_format="ndjson")
+        )
+        chunk = [
+            (
+                line,
+                {
+                    "name": "Desk lamp",
+                    "desc": "A lamp.",
+                    "price_current": "10.00",
+                    "category_slug": "lamps",
+                    "in_stock": 1,
+                },
+            )
+            for line in range(1, size + 1)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            importer.import_chunk(chunk)
+        self.assertEqual(importer.product_import.created_rows, size)
+        return [query["sql"] for query in queries]
+
+    def test_chunk_queries_do_not_grow_with_its_rows(self):
+        small, large = self.import_chunk(2), self.import_chunk(20)
+        self.assertEqual(len(small), len(large))
+        # The slugs are looked up once for the whole chunk, not per product.
+        slug_lookups = [
+            sql for sql in large if sql.startswith("SELECT") and "slug" in sql
+        ]
+        self.assertEqual(len(slug_lookups), 1)
+        inserts = [sql for sql in large if sql.startswith('INSERT INTO "shop_product"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_chunk_slugs_are_unique(self):
+        self.import_chunk(5)
+        slugs = list(Product.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs), 7)
+        self.assertEqual(len(set(slugs)), 7)
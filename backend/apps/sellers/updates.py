@@ -0,0 +1,103 @@
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from backend.apps.shop.caching import invalidate_product_listings
+from backend.apps.shop.listing import refresh_product_listings
+from backend.apps.shop.models import Product
+
+# Slugs or ids looked up per query when reading and locking current values.
+LOOKUP_CHUNK_SIZE = 5000
+
+UPDATE_SQL = """
+UPDATE shop_product AS p SET
+    price_old = CASE
+        WHEN v.price_current IS NOT NULL AND v.price_current <> p.price_current
+        THEN p.price_current ELSE p.price_old END,
+    price_current = COALESCE(v.price_current, p.price_current),
+    in_stock = COALESCE(v.in_stock, p.in_stock),
+    updated_at = now()
+FROM unnest(%s::uuid[], %s::numeric[], %s::integer[])
+    AS v(id, price_current, in_stock)
+WHERE p.id = v.id
+"""
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def bulk_update_products(seller, rows: list[dict]) -> dict:
+    """
+    Apply price and stock changes to many products of ``seller`` at once.
+
+    Current values are read (and locked, in product id order like checkout
+    does, so the two cannot deadlock) in chunks, rows that change nothing
+    are dropped and the rest is written with a single ``UPDATE ... FROM
+    unnest(...)``. As with single product updates, a changed ``price_current``
+    moves the previous price into ``price_old``.
+
+    Args:
+        seller (Seller): The seller owning the products.
+        rows (list[dict]): ``{"slug", "price_current"?, "in_stock"?}`` items.
+
+    Returns:
+        dict: Counters, the slugs that were not found and a per-slug map of
+        ``[old, new]`` pairs for every changed field.
+    """
+
+    wanted = {row["slug"]: row for row in rows}
+    changes = {}
+    ids, prices, stocks = [], [], []
+
+    with transaction.atomic():
+        product_ids = sorted(
+            product_id
+            for slugs in _chunks(wanted, LOOKUP_CHUNK_SIZE)
+            for product_id in Product.objects.filter(
+                seller=seller, slug__in=slugs
+            ).values_list("id", flat=True)
+        )
+        for chunk_ids in _chunks(product_ids, LOOKUP_CHUNK_SIZE):
+            current = (
+                Product.objects.select_for_update()
+                .filter(seller=seller, id__in=chunk_ids)
+                .order_by("id")
+                .values_list("id", "slug", "price_current", "in_stock")
+            )
+            for product_id, slug, price_current, in_stock in current:
+                row = wanted[slug]
+                diff = {}
+                price = row.get("price_current")
+                if price is not None and price != price_current:
+                    diff["price_current"] = [str(price_current), str(price)]
+                else:
+                    price = None
+                stock = row.get("in_stock")
+                if stock is not None and stock != in_stock:
+                    diff["in_stock"] = [in_stock, stock]
+                else:
+                    stock = None
+                changes[slug] = diff
+                if diff:
+                    ids.append(product_id)
+                    prices.append(price)
+                    stocks.append(stock)
+
+        if ids:
+            with connection.cursor() as cursor:
+                cursor.execute(UPDATE_SQL, [ids, prices, stocks])
+            refresh_product_listings(Q(seller=seller, id__in=ids))
+            transaction.on_commit(invalidate_product_listings)
+
+    return {
+        "received": len(rows),
+        "matched": len(changes),
+        "updated": len(ids),
+        "unchanged": len(changes) - len(ids),
+        "not_found": [slug for slug in wanted if slug not in changes],
+        "changes": {slug: diff for slug, diff in changes.items() if diff},
+    }
@@ -4,10 +4,24 @@ from backend.apps.sellers.views import (
     SellersView,
     SellerProductsView,
     SellerProductView,
+    SellerProductImportsView,
+    SellerProductImportView,
+    SellerProductsBulkUpdateView,
+    SellerProductsExportView,
+    SellerOrdersExportView,
+    SellerOrdersView,
+    SellerOrderItemsView,
 )
 
 urlpatterns = [
     path("", SellersView.as_view()),
     path("products/", SellerProductsView.as_view()),
+    path("products/export/", SellerProductsExportView.as_view()),
+    path("products/bulk-update/", SellerProductsBulkUpdateView.as_view()),
+    path("products/import/", SellerProductImportsView.as_view()),
+    path("products/import/<uuid:id>/", SellerProductImportView.as_view()),
     path("products/<slug:slug>/", SellerProductView.as_view()),
+    path("orders/", SellerOrdersView.as_view()),
+    path("orders/export/", SellerOrdersExportView.as_view()),
+    path("orders/<str:tx_ref>/", SellerOrderItemsView.as_view()),
 ]
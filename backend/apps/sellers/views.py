@@ -1,14 +1,40 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.utils.text import slugify
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from adrf.views import APIView as AsyncAPIView
 
+from backend.apps.common.paginations import KeysetPagination
 from backend.apps.common.permissions import IsSeller
 from backend.apps.profiles.models import OrderItem, Order
-from backend.apps.sellers.models import Seller
-from backend.apps.sellers.serializers import SellerSerializer
+from backend.apps.sellers.exports import (
+    EXPORT_FORMATS,
+    seller_orders_export,
+    seller_products_export,
+)
+from backend.apps.sellers.imports import ProductImporter
+from backend.apps.sellers.models import ProductImport, Seller
+from backend.apps.sellers.serializers import (
+    BulkProductUpdateSerializer,
+    CreateProductImportSerializer,
+    ProductImportSerializer,
+    SellerSerializer,
+)
+from backend.apps.sellers.tasks import import_products
+from backend.apps.sellers.updates import bulk_update_products
+from backend.apps.shop.caching import (
+    ainvalidate_product_listings,
+    invalidate_product_listings,
+)
+from backend.apps.shop.mixins import ProductListMixin
 from backend.apps.shop.models import Category, Product
+from backend.apps.shop.schema_examples import CURSOR_PAGE_PARAMS, PRODUCT_PARAM_EXAMPLE
 from backend.apps.shop.serializers import (
     ProductSerializer,
     CreateProductSerializer,
@@ -43,29 +69,28 @@ class SellersView(APIView):
             return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SellerProductsView(APIView):
-    serializer_class = ProductSerializer
+class SellerProductsView(ProductListMixin, AsyncAPIView):
     permission_classes = [IsSeller]
 
     @extend_schema(
         summary="Seller Products Fetch",
         description="""
             This endpoint returns all products from a seller.
-            Products can be filtered by name, sizes or colors.
+            Products can be filtered by price, stock or creation date.
         """,
         tags=tags,
+        parameters=PRODUCT_PARAM_EXAMPLE,
     )
-    def get(self, request, *args, **kwargs):
-        seller = Seller.objects.get_or_none(user=request.user, is_approved=True)
+    async def get(self, request, *args, **kwargs):
+        seller = await Seller.objects.aget_or_none(user=request.user, is_approved=True)
         if not seller:
             return Response(
                 data={"message": "Access is denied"}, status=status.HTTP_403_FORBIDDEN
             )
-        products = Product.objects.select_related(
-            "category", "seller", "seller__user"
-        ).filter(seller=seller)
-        serializer = self.serializer_class(products, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        products = self.get_product_queryset().filter(seller=seller)
+        return await self.list_products(
+            request, products, scope=f"seller:{seller.pk}"
+        )
 
     @extend_schema(
         summary="Create a product",
@@ -76,9 +101,11 @@ class SellerProductsView(APIView):
         request=CreateProductSerializer,
         responses=ProductSerializer,
     )
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         serializer = CreateProductSerializer(data=request.data)
-        seller = Seller.objects.get_or_none(user=request.user, is_approved=True)
+        seller = await Seller.objects.select_related("user").aget_or_none(
+            user=request.user, is_approved=True
+        )
         if not seller:
             return Response(
                 data={"message": "Access is denied"}, status=status.HTTP_403_FORBIDDEN
@@ -86,7 +113,7 @@ class SellerProductsView(APIView):
         if serializer.is_valid():
             data = serializer.validated_data
             category_slug = data.pop("category_slug", None)
-            category = Category.objects.get_or_none(slug=category_slug)
+            category = await Category.objects.aget_or_none(slug=category_slug)
             if not category:
                 return Response(
                     data={"message": "Category does not exist!"},
@@ -94,7 +121,8 @@ class SellerProductsView(APIView):
                 )
             data["category"] = category
             data["seller"] = seller
-            new_prod = Product.objects.create(**data)
+            new_prod = await Product.objects.acreate(**data)
+            await ainvalidate_product_listings()
             serializer = ProductSerializer(new_prod)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
@@ -133,10 +161,17 @@ class SellerProductView(APIView):
                     data={"message": "Category does not exist!"}, status=404
                 )
             data["category"] = category
+            update_fields = [*data, "updated_at"]
             new_price = data.get("price_current")
             if new_price is not None and new_price != product.price_current:
                 product.price_old = product.price_current
-            product.save()
+                update_fields.append("price_old")
+            for field, value in data.items():
+                setattr(product, field, value)
+            # Only the edited columns, so rating counters updated concurrently
+            # by reviews are not overwritten with the values loaded above.
+            product.save(update_fields=update_fields)
+            invalidate_product_listings()
             return Response(data=new_product_data.data, status=status.HTTP_200_OK)
 
         return Response(
@@ -163,54 +198,244 @@ class SellerProductView(APIView):
             )
 
         product.delete()
+        invalidate_product_listings()
         return Response(
             data={"message": "Product deleted"}, status=status.HTTP_204_NO_CONTENT
         )
 
 
+class SellerProductsBulkUpdateView(APIView):
+    serializer_class = BulkProductUpdateSerializer
+    permission_classes = [IsSeller]
+
+    @extend_schema(
+        summary="Bulk update prices and stock",
+        description="""
+            This endpoint allows a seller to reprice and restock many products
+            at once from a list of {slug, price_current, in_stock} items.
+            All changes are applied in one transaction; a changed price moves
+            the previous one into price_old. The response summarizes the
+            changes as [old, new] pairs per slug.
+        """,
+        tags=tags,
+        request=BulkProductUpdateSerializer(many=True),
+    )
+    def post(self, request, *args, **kwargs):
+        seller = Seller.objects.get_or_none(user=request.user, is_approved=True)
+        if not seller:
+            return Response(
+                data={"message": "Access is denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = self.serializer_class(
+            data=request.data,
+            many=True,
+            min_length=1,
+            max_length=settings.PRODUCT_BULK_UPDATE_MAX_ROWS,
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        summary = bulk_update_products(seller, serializer.validated_data)
+        return Response(data=summary, status=status.HTTP_200_OK)
+
+
+class SellerProductImportsView(APIView):
+    serializer_class = CreateProductImportSerializer
+    permission_classes = [IsSeller]
+    parser_classes = [MultiPartParser]
+
+    @extend_schema(
+        summary="Bulk import products",
+        description="""
+            This endpoint allows a seller to create many products from a CSV
+            or NDJSON file with the columns name, desc, price_current,
+            category_slug, in_stock and optionally image1-image3 (names of
+            files in the media storage). Invalid rows are reported per line
+            and skipped. Small files are imported within the request (200),
+            larger ones are queued (202) and can be polled for progress.
+        """,
+        tags=tags,
+        request=CreateProductImportSerializer,
+        responses=ProductImportSerializer,
+    )
+    def post(self, request, *args, **kwargs):
+        seller = Seller.objects.get_or_none(user=request.user, is_approved=True)
+        if not seller:
+            return Response(
+                data={"message": "Access is denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        product_import = ProductImport.objects.create(seller=seller, **data)
+        if data["file"].size <= settings.PRODUCT_IMPORT_SYNC_MAX_BYTES:
+            ProductImporter(product_import).run()
+            return Response(
+                ProductImportSerializer(product_import).data, status=status.HTTP_200_OK
+            )
+
+        import_id = str(product_import.id)
+        transaction.on_commit(lambda: import_products.delay(import_id))
+        return Response(
+            ProductImportSerializer(product_import).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class SellerProductImportView(APIView):
+    serializer_class = ProductImportSerializer
+    permission_classes = [IsSeller]
+
+    @extend_schema(
+        summary="Bulk import progress",
+        description="""
+            This endpoint returns the status, row counters and per-line errors
+            of a bulk product import.
+        """,
+        tags=tags,
+    )
+    def get(self, request, *args, **kwargs):
+        product_import = ProductImport.objects.get_or_none(
+            id=kwargs["id"], seller__user=request.user
+        )
+        if not product_import:
+            return Response(
+                data={"message": "Import does not exist!"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = self.serializer_class(product_import)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
+
+EXPORT_PARAMS = [
+    OpenApiParameter(
+        name="file_format",
+        description="Export format: ndjson (default) or csv",
+        required=False,
+        type=OpenApiTypes.STR,
+        enum=list(EXPORT_FORMATS),
+    ),
+]
+
+
+class SellerExportView(APIView):
+    permission_classes = [IsSeller]
+    export = None
+
+    def get(self, request, *args, **kwargs):
+        seller = Seller.objects.get_or_none(user=request.user, is_approved=True)
+        if not seller:
+            return Response(
+                data={"message": "Access is denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+        file_format = request.query_params.get("file_format", "ndjson")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"file_format": [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self.export(seller, file_format)
+
+
+class SellerProductsExportView(SellerExportView):
+    export = staticmethod(seller_products_export)
+
+    @extend_schema(
+        summary="Export seller products",
+        description="""
+            This endpoint streams all products of a seller as NDJSON or CSV,
+            one row at a time.
+        """,
+        tags=tags,
+        parameters=EXPORT_PARAMS,
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class SellerOrdersExportView(SellerExportView):
+    export = staticmethod(seller_orders_export)
+
+    @extend_schema(
+        summary="Export seller orders",
+        description="""
+            This endpoint streams every order item of a seller's products,
+            with its order reference and statuses, as NDJSON or CSV.
+        """,
+        tags=tags,
+        parameters=EXPORT_PARAMS,
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
 class SellerOrdersView(APIView):
     serializer_class = OrderSerializer
     permission_classes = [IsSeller]
+    pagination_class = KeysetPagination
 
     @extend_schema(
         operation_id="seller_orders_view",
         summary="Seller Orders Fetch",
         description="""
-            This endpoint returns all orders for a particular seller.
+            This endpoint returns the orders containing products of a
+            particular seller, newest first, with cursor pagination (follow
+            the next/previous links).
         """,
         tags=tags,
+        parameters=CURSOR_PAGE_PARAMS,
     )
     def get(self, request):
         seller = request.user.seller
-        orders = (
-            Order.objects.filter(orderitems__product__seller=seller)
-            .distinct()
-            .order_by("-created_at")
+        # EXISTS instead of a join with DISTINCT, so the keyset ordering can
+        # walk the orders index and stop after one page.
+        orders = Order.objects.filter(
+            Exists(
+                OrderItem.objects.filter(order=OuterRef("pk"), product__seller=seller)
+            )
+        ).select_related("user")
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(orders, request)
+        serializer = self.serializer_class(page, many=True)
+        return Response(
+            data=paginator.get_paginated_data(serializer.data),
+            status=status.HTTP_200_OK,
         )
-        serializer = self.serializer_class(orders, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
 class SellerOrderItemsView(APIView):
     serializer_class = CheckItemOrderSerializer
     permission_classes = [IsSeller]
+    pagination_class = KeysetPagination
 
     @extend_schema(
         operation_id="seller_order_items_view",
         summary="Seller Items Order Fetch",
         description="""
-            This endpoint returns all items order for a particular seller.
+            This endpoint returns the items of an order that belong to a
+            particular seller, newest first, with cursor pagination (follow
+            the next/previous links).
         """,
         tags=tags,
+        parameters=CURSOR_PAGE_PARAMS,
     )
     def get(self, request, **kwargs):
         seller = request.user.seller
-        order = Order.objects.get_or_none(tx_ref=kwargs["tx_ref"])
-        if not order:
-            return Response(
-                data={"message": "Order does not exist!"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        order_items = OrderItem.objects.filter(order=order, product__seller=seller)
-        serializer = self.serializer_class(order_items, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        order_items = OrderItem.objects.filter(
+            order__tx_ref=kwargs["tx_ref"], product__seller=seller
+        ).select_related(
+            "product",
+            "product__category",
+            "product__seller",
+            "product__seller__user",
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(order_items, request)
+        serializer = self.serializer_class(page, many=True)
+        return Response(
+            data=paginator.get_paginated_data(serializer.data),
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,59 @@
+import hashlib
+import uuid
+
+from django.core.cache import cache
+
+PRODUCT_LISTING_VERSION_KEY = "shop:products:version"
+
+
+def normalize_filter_params(filterset) -> str:
+    """
+    Build a canonical representation of a validated ``ProductFilter``.
+
+    Uses the cleaned form values, so ``?min_price=10`` and ``?min_price=10.0``
+    map to the same string, and drops empty filters.
+
+    Args:
+        filterset (FilterSet): A filterset on which ``is_valid()`` returned True.
+
+    Returns:
+        str: The normalized parameter set, e.g. ``"in_stock=1&min_price=10"``.
+    """
+
+    cleaned = filterset.form.cleaned_data
+    return "&".join(
+        f"{name}={cleaned[name]}"
+        for name in sorted(cleaned)
+        if cleaned[name] not in (None, "")
+    )
+
+
+async def aget_listing_version() -> str:
+    version = await cache.aget(PRODUCT_LISTING_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(PRODUCT_LISTING_VERSION_KEY, version, None):
+            version = await cache.aget(PRODUCT_LISTING_VERSION_KEY)
+    return version
+
+
+async def aproduct_listing_key(prefix: str, filterset, scope: str = "") -> str:
+    """
+    Cache key for data derived from a filtered product listing.
+
+    The key embeds the current listing version, so every entry built before
+    the last product change is invalidated at once.
+    """
+
+    version = await aget_listing_version()
+    params = normalize_filter_params(filterset)
+    digest = hashlib.md5(f"{scope}?{params}".encode()).hexdigest()
+    return f"shop:products:{prefix}:{version}:{digest}"
+
+
+def invalidate_product_listings() -> None:
+    cache.set(PRODUCT_LISTING_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+async def ainvalidate_product_listings() -> None:
+    await cache.aset(PRODUCT_LISTING_VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,335 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.utils.module_loading import import_string
+
+from backend.apps.profiles.models import OrderItem
+from backend.apps.shop.models import Product
+from backend.apps.shop.serializers import (
+    OrderItemProductSerializer,
+    OrderItemSerializer,
+)
+
+CART_SUMMARY_CACHE_KEY = "shop:cart-summary:{user_id}"
+CART_CACHE_KEY = "shop:cart:{user_id}"
+
+
+def get_cart_storage(user):
+    """
+    Instantiate the ``CART_STORAGE`` backend for ``user``.
+
+    Carts are keyed by user, so ``user`` must be authenticated; the cart
+    views require it.
+    """
+
+    return import_string(settings.CART_STORAGE)(user)
+
+
+def summarize(lines) -> dict:
+    """
+    Header badge summary (item count, subtotal) of ``(quantity, price)`` pairs.
+    """
+
+    items = 0
+    subtotal = Decimal("0.00")
+    for quantity, price in lines:
+        items += quantity
+        subtotal += quantity * price
+    return {"items": items, "subtotal": f"{subtotal:.2f}"}
+
+
+def get_product(slug):
+    return Product.objects.select_related("seller", "seller__user").get_or_none(
+        slug=slug
+    )
+
+
+def get_products(slugs) -> dict:
+    """
+    Map the existing products among ``slugs`` by slug, in one query.
+    """
+
+    products = Product.objects.select_related("seller", "seller__user").filter(
+        slug__in=slugs
+    )
+    return {product.slug: product for product in products}
+
+
+class BaseCartStorage:
+    """
+    Where a user's cart lives until checkout.
+
+    Backends return items in the ``OrderItemSerializer`` representation and
+    ``persist`` materializes the cart as open ``OrderItem`` rows (``order``
+    unset) for the checkout to attach to an order.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def get_items(self) -> list[dict]:
+        raise NotImplementedError
+
+    def set_quantity(self, slug: str, quantity: int):
+        """
+        Add, update or (with ``quantity`` 0) remove the product ``slug``.
+
+        Returns:
+            tuple: The item representation (None once removed) and whether
+            it was added, or None if the product does not exist.
+        """
+
+        raise NotImplementedError
+
+    def set_quantities(self, quantities: dict[str, int]) -> list[str]:
+        """
+        Apply ``set_quantity`` to many products at once.
+
+        Args:
+            quantities (dict[str, int]): Product slug -> quantity, 0 removes.
+
+        Returns:
+            list[str]: The slugs of products that do not exist.
+        """
+
+        raise NotImplementedError
+
+    def get_summary(self) -> dict:
+        raise NotImplementedError
+
+    def persist(self) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class DatabaseCartStorage(BaseCartStorage):
+    """
+    Cart items are open ``OrderItem`` rows; the summary is cached per user for
+    ``CART_SUMMARY_CACHE_TIMEOUT`` seconds, as price changes do not reach it.
+    """
+
+    def get_queryset(self):
+        return OrderItem.objects.filter(user=self.user, order=None)
+
+    def get_items(self):
+        orderitems = self.get_queryset().select_related(
+            "product", "product__seller", "product__seller__user"
+        )
+        return OrderItemSerializer(orderitems, many=True).data
+
+    def set_quantity(self, slug, quantity):
+        product = get_product(slug)
+        if not product:
+            return None
+        orderitem, created = OrderItem.objects.update_or_create(
+            user=self.user,
+            order=None,
+            product=product,
+            defaults={"quantity": quantity},
+        )
+        self.invalidate_summary()
+        if orderitem.quantity == 0:
+            orderitem.delete()
+            return None, created
+        return OrderItemSerializer(orderitem).data, created
+
+    def set_quantities(self, quantities):
+        """
+        Upsert and delete the open ``OrderItem`` rows in one transaction.
+
+        Products are resolved with one query, kept quantities are written with
+        a single ``INSERT ... ON CONFLICT DO UPDATE`` on the
+        ``unique_user_product_order`` constraint and removed ones with a
+        single ``DELETE``.
+        """
+
+        products = Product.objects.filter(slug__in=quantities).values_list(
+            "slug", "id"
+        )
+        product_ids = dict(products)
+        upserts = [
+            OrderItem(user=self.user, product_id=product_id, quantity=quantity)
+            for slug, product_id in product_ids.items()
+            if (quantity := quantities[slug]) > 0
+        ]
+        removed = [
+            product_id
+            for slug, product_id in product_ids.items()
+            if quantities[slug] == 0
+        ]
+        with transaction.atomic():
+            if upserts:
+                OrderItem.objects.bulk_create(
+                    upserts,
+                    update_conflicts=True,
+                    unique_fields=["user", "product", "order"],
+                    update_fields=["quantity", "updated_at"],
+                )
+            if removed:
+                self.get_queryset().filter(product_id__in=removed).delete()
+        self.invalidate_summary()
+        return [slug for slug in quantities if slug not in product_ids]
+
+    def get_summary(self):
+        key = CART_SUMMARY_CACHE_KEY.format(user_id=self.user.pk)
+        summary = cache.get(key)
+        if summary is None:
+            totals = self.get_queryset().aggregate(
+                items=Sum("quantity"),
+                subtotal=Sum(
+                    ExpressionWrapper(
+                        F("quantity") * F("product__price_current"),
+                        output_field=DecimalField(max_digits=12, decimal_places=2),
+                    )
+                ),
+            )
+            subtotal = totals["subtotal"] or Decimal("0.00")
+            summary = {"items": totals["items"] or 0, "subtotal": f"{subtotal:.2f}"}
+            cache.set(key, summary, settings.CART_SUMMARY_CACHE_TIMEOUT)
+        return summary
+
+    def persist(self):
+        pass
+
+    def clear(self):
+        self.invalidate_summary()
+
+    def invalidate_summary(self):
+        cache.delete(CART_SUMMARY_CACHE_KEY.format(user_id=self.user.pk))
+
+
+class CacheCartStorage(BaseCartStorage):
+    """
+    Cart kept in the Django cache and written to ``OrderItem`` only at checkout.
+
+    The cart is one cache entry mapping product slugs to their item
+    representation, so reading it, changing the quantity of a product already
+    in it and the summary never query Postgres; adding a product looks it up
+    once. Prices are those at the time the product was added; the checkout
+    uses the current ones.
+    """
+
+    def __init__(self, user):
+        super().__init__(user)
+        self.key = CART_CACHE_KEY.format(user_id=user.pk)
+
+    def get_lines(self) -> dict:
+        return cache.get(self.key) or {}
+
+    def save_lines(self, lines: dict) -> None:
+        cache.set(self.key, lines, settings.CART_CACHE_TIMEOUT)
+
+    def set_quantity(self, slug, quantity):
+        lines = self.get_lines()
+        item = lines.get(slug)
+        created = item is None
+        if created:
+            product = get_product(slug)
+            if not product:
+                return None
+            item = self.new_item(product)
+
+        if quantity == 0:
+            if not created:
+                del lines[slug]
+                self.save_lines(lines)
+            return None, created
+
+        self.set_item_quantity(item, quantity)
+        lines[slug] = item
+        self.save_lines(lines)
+        return self.represent(item), created
+
+    def set_quantities(self, quantities):
+        """
+        Update the cached cart with one cache write.
+
+        Only products not yet in the cart are looked up, in one query.
+        """
+
+        lines = self.get_lines()
+        new_slugs = [slug for slug in quantities if slug not in lines]
+        products = get_products(new_slugs) if new_slugs else {}
+        not_found = []
+        for slug, quantity in quantities.items():
+            item = lines.get(slug)
+            if item is None:
+                product = products.get(slug)
+                if product is None:
+                    not_found.append(slug)
+                    continue
+                item = self.new_item(product)
+            if quantity == 0:
+                lines.pop(slug, None)
+                continue
+            self.set_item_quantity(item, quantity)
+            lines[slug] = item
+        self.save_lines(lines)
+        return not_found
+
+    @staticmethod
+    def new_item(product) -> dict:
+        return {
+            "product_id": str(product.id),
+            "product": dict(OrderItemProductSerializer(product).data),
+        }
+
+    @staticmethod
+    def set_item_quantity(item, quantity) -> None:
+        price = Decimal(item["product"]["price"])
+        item["quantity"] = quantity
+        item["total"] = f"{price * quantity:.2f}"
+
+    @staticmethod
+    def represent(item) -> dict:
+        return {
+            "product": item["product"],
+            "quantity": item["quantity"],
+            "total": item["total"],
+        }
+
+    def get_items(self):
+        return [self.represent(item) for item in self.get_lines().values()]
+
+    def get_summary(self):
+        return summarize(
+            (item["quantity"], Decimal(item["product"]["price"]))
+            for item in self.get_lines().values()
+        )
+
+    def persist(self):
+        """
+        Replace the user's open ``OrderItem`` rows with the cached cart.
+
+        Products deleted since they were added are skipped.
+        """
+
+        lines = self.get_lines()
+        product_ids = [item["product_id"] for item in lines.values()]
+        live = {
+            str(pk)
+            for pk in Product.objects.filter(id__in=product_ids).values_list(
+                "id", flat=True
+            )
+        }
+        with transaction.atomic():
+            OrderItem.objects.filter(user=self.user, order=None).delete()
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        user=self.user,
+                        product_id=item["product_id"],
+                        quantity=item["quantity"],
+                    )
+                    for item in lines.values()
+                    if item["product_id"] in live
+                ]
+            )
+
+    def clear(self):
+        cache.delete(self.key)
@@ -0,0 +1,209 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+
+from backend.apps.profiles.models import Order, OrderItem
+from backend.apps.shop.models import Product
+from backend.apps.shop.tasks import refresh_product_listing
+
+# ShippingAddress fields copied onto the order.
+SHIPPING_FIELDS = [
+    "full_name",
+    "email",
+    "phone",
+    "address",
+    "city",
+    "country",
+    "zipcode",
+]
+
+# Status of a checkout queued with CHECKOUT_MODE "queue", by ticket.
+CHECKOUT_TICKET_CACHE_KEY = "shop:checkout-ticket:{ticket}"
+# Held while a checkout of the user's cart runs.
+CHECKOUT_LOCK_CACHE_KEY = "shop:checkout-lock:{user_id}"
+
+DECREMENT_STOCK_SQL = """
+UPDATE shop_product AS p SET
+    in_stock = p.in_stock - v.quantity,
+    updated_at = now()
+FROM unnest(%s::uuid[], %s::integer[]) AS v(id, quantity)
+WHERE p.id = v.id
+"""
+
+
+class CheckoutError(Exception):
+    """
+    The cart cannot be checked out; the message is meant for the user.
+    """
+
+
+class EmptyCartError(CheckoutError):
+    def __init__(self):
+        super().__init__("No Items in Cart")
+
+
+class OutOfStockError(CheckoutError):
+    """
+    Some cart items exceed the stock left.
+
+    Attributes:
+        shortages (dict): Product slug -> quantity still in stock.
+    """
+
+    def __init__(self, shortages: dict):
+        self.shortages = shortages
+        super().__init__("Not enough stock for some items in cart")
+
+
+class CheckoutInProgressError(CheckoutError):
+    def __init__(self):
+        super().__init__("A checkout of this cart is already in progress")
+
+
+@contextmanager
+def checkout_lock(user):
+    """
+    Let a single checkout of ``user``'s cart run at a time.
+
+    A ``cache.add`` marker, released on exit and expiring after
+    ``CHECKOUT_LOCK_TIMEOUT`` in case its holder dies.
+
+    Raises:
+        CheckoutInProgressError: Another checkout holds the lock.
+    """
+
+    key = CHECKOUT_LOCK_CACHE_KEY.format(user_id=user.pk)
+    if not cache.add(key, True, settings.CHECKOUT_LOCK_TIMEOUT):
+        raise CheckoutInProgressError()
+    try:
+        yield
+    finally:
+        cache.delete(key)
+
+
+def checkout_cart(cart, shipping) -> Order:
+    """
+    Place an order for the cart storage ``cart`` and empty it.
+
+    The cart is written to ``OrderItem`` rows, ordered and cleared under
+    ``checkout_lock``: with ``CacheCartStorage`` two overlapping checkouts
+    would otherwise both write the cached cart back and both place an order.
+
+    Raises:
+        CheckoutError: See ``checkout_lock`` and ``place_order``.
+    """
+
+    with checkout_lock(cart.user):
+        cart.persist()
+        order = place_order(cart.user, shipping)
+        cart.clear()
+    return order
+
+
+def place_order(user, shipping) -> Order:
+    """
+    Turn the open ``OrderItem`` rows of ``user`` into an order, reserving stock.
+
+    Everything happens in one transaction:
+
+    - the cart rows are locked, so concurrent checkouts of the same cart
+      serialize and only the first one finds items;
+    - the products are locked with ``SELECT ... FOR UPDATE`` in product id
+      order, so checkouts sharing products wait for each other instead of
+      deadlocking, and their stock is checked;
+    - stock is decremented with a single ``UPDATE ... FROM unnest(...)``;
+    - the items get their ``unit_price`` and the order its ``subtotal`` and
+      ``total`` from the locked prices, so they never change afterwards.
+
+    A hot product is therefore locked for a few statements per checkout, and
+    stock can never go below zero.
+
+    Args:
+        user (User): The buyer.
+        shipping (ShippingAddress): The address copied onto the order.
+
+    Raises:
+        EmptyCartError: The cart has no items.
+        OutOfStockError: Some items exceed the stock left (or were deleted).
+    """
+
+    with transaction.atomic():
+        items = (
+            OrderItem.objects.select_for_update(of=("self",))
+            .filter(user=user, order=None)
+            .values_list("id", "product_id", "product__slug", "quantity")
+        )
+        item_ids, slugs, quantities = [], {}, {}
+        for item_id, product_id, slug, quantity in items:
+            item_ids.append(item_id)
+            slugs[product_id] = slug
+            quantities[product_id] = quantity
+        if not quantities:
+            raise EmptyCartError()
+
+        stock, prices = {}, {}
+        products = (
+            Product.objects.select_for_update()
+            .filter(id__in=quantities)
+            .order_by("id")
+            .values_list("id", "in_stock", "price_current")
+        )
+        for product_id, in_stock, price_current in products:
+            stock[product_id] = in_stock
+            prices[product_id] = price_current
+        shortages = {
+            slugs[product_id]: max(stock.get(product_id, 0), 0)
+            for product_id, quantity in quantities.items()
+            if stock.get(product_id, 0) < quantity
+        }
+        if shortages:
+            raise OutOfStockError(shortages)
+
+        product_ids = sorted(quantities)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                DECREMENT_STOCK_SQL,
+                [product_ids, [quantities[pk] for pk in product_ids]],
+            )
+        subtotal = sum(prices[pk] * quantities[pk] for pk in product_ids)
+        order = Order.objects.create(
+            user=user,
+            subtotal=subtotal,
+            total=subtotal,
+            **{field: getattr(shipping, field) for field in SHIPPING_FIELDS},
+        )
+        # Only the locked, stock-checked rows: a line added to the cart since
+        # then stays in the cart.
+        OrderItem.objects.filter(pk__in=item_ids).update(
+            order=order,
+            unit_price=Subquery(
+                Product.objects.filter(pk=OuterRef("product_id")).values(
+                    "price_current"
+                )[:1]
+            ),
+        )
+
+        # Coalesced, so a product selling many times a second is refreshed
+        # once per window rather than once per order.
+        for product_id in product_ids:
+            transaction.on_commit(
+                lambda pk=str(product_id): refresh_product_listing.delay_coalesced(
+                    id=pk
+                )
+            )
+    return order
+
+
+def save_ticket(ticket: str, user_id, status: str, **details) -> None:
+    """
+    Record the ``status`` (QUEUED, PLACED or FAILED) of a queued checkout.
+    """
+
+    cache.set(
+        CHECKOUT_TICKET_CACHE_KEY.format(ticket=ticket),
+        {"ticket": ticket, "user_id": str(user_id), "status": status, **details},
+        settings.CHECKOUT_TICKET_TIMEOUT,
+    )
@@ -0,0 +1,55 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from backend.apps.shop.caching import aproduct_listing_key
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+
+
+async def aestimate_count(queryset) -> int | None:
+    """
+    Return the planner's row estimate for ``queryset`` without executing it.
+
+    Returns None on databases other than PostgreSQL.
+    """
+
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = await queryset.order_by().values("pk").aexplain(format="json")
+    return int(json.loads(plan)[0]["Plan"]["Plan Rows"])
+
+
+async def aget_product_count(queryset, filterset, scope: str = "") -> tuple[int, str]:
+    """
+    Count a filtered product listing as cheaply as possible.
+
+    Results are cached per normalized filter set. Broad queries, whose planner
+    estimate is above ``PRODUCT_COUNT_ESTIMATE_THRESHOLD``, get the estimate
+    instead of an exact ``COUNT(*)``.
+
+    Args:
+        queryset (QuerySet): The filtered product queryset.
+        filterset (ProductFilter): The validated filterset that produced it.
+        scope (str): Extra key part for listings narrowed outside the filterset.
+
+    Returns:
+        tuple[int, str]: The count and its kind, ``"exact"`` or ``"estimated"``.
+    """
+
+    key = await aproduct_listing_key("count", filterset, scope)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+
+    estimate = await aestimate_count(queryset)
+    if estimate is not None and estimate >= settings.PRODUCT_COUNT_ESTIMATE_THRESHOLD:
+        result = (estimate, COUNT_ESTIMATED)
+    else:
+        result = (await queryset.acount(), COUNT_EXACT)
+
+    await cache.aset(key, result, settings.PRODUCT_COUNT_CACHE_TIMEOUT)
+    return result
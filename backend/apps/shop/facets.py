@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from backend.apps.shop.caching import aproduct_listing_key
+
+FACETS = ("price", "category", "in_stock")
+
+
+def parse_facets(value: str) -> list[str]:
+    """
+    Parse a ``?facets=price,category`` value into a sorted list of facet names.
+
+    Raises:
+        ValueError: If an unknown facet is requested.
+    """
+
+    facets = sorted({name.strip() for name in value.split(",") if name.strip()})
+    unknown = [name for name in facets if name not in FACETS]
+    if unknown:
+        raise ValueError(f"Unknown facets: {', '.join(unknown)}.")
+    return facets
+
+
+def get_price_ranges() -> list[tuple[Decimal | None, Decimal | None]]:
+    edges = [Decimal(edge) for edge in settings.PRODUCT_PRICE_FACET_EDGES]
+    bounds = [None, *edges, None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _price_filter(low, high) -> Q:
+    condition = Q()
+    if low is not None:
+        condition &= Q(price_current__gte=low)
+    if high is not None:
+        condition &= Q(price_current__lt=high)
+    return condition
+
+
+async def aget_product_facets(queryset, filterset, facets, scope: str = "") -> dict:
+    """
+    Compute facet aggregates for a filtered product listing in one SQL query.
+
+    Price buckets and the in-stock count are conditional ``COUNT``s. When the
+    category facet is requested the same query is grouped by category and the
+    global counters are summed from the groups.
+
+    Args:
+        queryset (QuerySet): The filtered product queryset.
+        filterset (ProductFilter): The validated filterset that produced it.
+        facets (list[str]): Facet names returned by ``parse_facets``.
+        scope (str): Extra key part for listings narrowed outside the filterset.
+
+    Returns:
+        dict: A mapping of facet name to its aggregate.
+    """
+
+    key = await aproduct_listing_key(f"facets:{','.join(facets)}", filterset, scope)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+
+    price_ranges = get_price_ranges()
+    aggregates = {"total": Count("pk")}
+    if "in_stock" in facets:
+        aggregates["in_stock"] = Count("pk", filter=Q(in_stock__gt=0))
+    if "price" in facets:
+        for index, (low, high) in enumerate(price_ranges):
+            aggregates[f"price_{index}"] = Count("pk", filter=_price_filter(low, high))
+
+    queryset = queryset.order_by()
+    if "category" in facets:
+        rows = [
+            row
+            async for row in queryset.values("category__slug", "category__name")
+            .annotate(**aggregates)
+            .order_by("-total", "category__name")
+        ]
+    else:
+        rows = [await queryset.aaggregate(**aggregates)]
+
+    result = {}
+    if "category" in facets:
+        result["category"] = [
+            {
+                "slug": row["category__slug"],
+                "name": row["category__name"],
+                "count": row["total"],
+            }
+            for row in rows
+        ]
+    if "in_stock" in facets:
+        result["in_stock"] = sum(row["in_stock"] for row in rows)
+    if "price" in facets:
+        result["price"] = [
+            {
+                "min": low,
+                "max": high,
+                "count": sum(row[f"price_{index}"] for row in rows),
+            }
+            for index, (low, high) in enumerate(price_ranges)
+        ]
+
+    await cache.aset(key, result, settings.PRODUCT_FACET_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,276 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from itertools import chain, islice
+from xml.sax.saxutils import XMLGenerator
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from backend.apps.sellers.models import Seller
+from backend.apps.shop.models import Category, Product
+
+FEED_FORMATS = ("xml", "csv")
+MANIFEST_NAME = "manifest.json"
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+GOOGLE_NS = "http://base.google.com/ns/1.0"
+
+# Feed column -> Product lookup, in output order.
+FEED_COLUMNS = {
+    "id": "slug",
+    "title": "name",
+    "description": "desc",
+    "price": "price_current",
+    "in_stock": "in_stock",
+    "product_type": "category__name",
+    "brand": "seller__business_name",
+    "image_link": "image1",
+}
+# Fields of every feed item, in output order.
+FEED_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "link",
+    "image_link",
+    "price",
+    "availability",
+    "product_type",
+    "brand",
+)
+
+
+def feed_path(name: str) -> str:
+    return os.path.join(settings.MEDIA_ROOT, settings.FEED_DIR, name)
+
+
+def feed_url(name: str) -> str:
+    return f"{settings.SITE_URL}{settings.MEDIA_URL}{settings.FEED_DIR}/{name}"
+
+
+@contextmanager
+def atomic_write(name: str, compress: bool = True):
+    """
+    Write feed file ``name`` through a temporary file renamed into place.
+
+    Readers (nginx) always see either the previous or the complete new file.
+    """
+
+    path = feed_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            stream = gzip.GzipFile(fileobj=raw, mode="wb") if compress else raw
+            with io.TextIOWrapper(stream, encoding="utf-8", newline="") as text:
+                yield text
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_manifest() -> dict:
+    try:
+        with open(feed_path(MANIFEST_NAME)) as manifest:
+            return json.load(manifest)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_manifest(manifest: dict) -> None:
+    with atomic_write(MANIFEST_NAME, compress=False) as out:
+        json.dump(manifest, out, indent=2)
+
+
+def catalog_modified_at():
+    """
+    Latest change to any product, category or seller, soft deletions included.
+    """
+
+    products = Product.objects.unfiltered().aggregate(
+        updated=Max("updated_at"), deleted=Max("deleted_at")
+    )
+    categories = Category.objects.aggregate(updated=Max("updated_at"))
+    sellers = Seller.objects.aggregate(updated=Max("updated_at"))
+    stamps = [*products.values(), categories["updated"], sellers["updated"]]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps).isoformat() if stamps else None
+
+
+def feed_rows():
+    """
+    Stream live products as feed dicts with a chunked server-side cursor.
+    """
+
+    storage = Product._meta.get_field("image1").storage
+    names = list(FEED_COLUMNS)
+    rows = (
+        Product.objects.order_by("created_at", "id")
+        .values_list(*FEED_COLUMNS.values())
+        .iterator(chunk_size=settings.FEED_CHUNK_SIZE)
+    )
+    for values in rows:
+        row = dict(zip(names, values))
+        row["link"] = settings.FEED_PRODUCT_URL.format(slug=row["id"])
+        row["price"] = f"{row['price']} {settings.FEED_CURRENCY}"
+        in_stock = row.pop("in_stock") > 0
+        row["availability"] = "in_stock" if in_stock else "out_of_stock"
+        row["image_link"] = (
+            f"{settings.SITE_URL}{storage.url(row['image_link'])}"
+            if row["image_link"]
+            else ""
+        )
+        row["brand"] = row["brand"] or ""
+        yield row
+
+
+def write_csv_feed(out) -> int:
+    writer = csv.DictWriter(out, fieldnames=FEED_FIELDS)
+    writer.writeheader()
+    count = 0
+    for row in feed_rows():
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_xml_feed(out) -> int:
+    """
+    Write an RSS 2.0 feed with ``g:`` attributes understood by marketplaces.
+    """
+
+    xml = XMLGenerator(out, encoding="utf-8")
+    xml.startDocument()
+    xml.startElement("rss", {"version": "2.0", "xmlns:g": GOOGLE_NS})
+    xml.startElement("channel", {})
+    _element(xml, "title", settings.FEED_TITLE)
+    _element(xml, "link", settings.SITE_URL)
+    count = 0
+    for row in feed_rows():
+        xml.startElement("item", {})
+        for name in FEED_FIELDS:
+            _element(xml, f"g:{name}", row[name])
+        xml.endElement("item")
+        count += 1
+    xml.endElement("channel")
+    xml.endElement("rss")
+    xml.endDocument()
+    return count
+
+
+def _element(xml, name, value):
+    xml.startElement(name, {})
+    xml.characters(str(value))
+    xml.endElement(name)
+
+
+def write_sitemaps() -> int:
+    """
+    Write gzipped sitemaps of live product and category pages plus an index.
+
+    Sitemaps hold at most ``SITEMAP_MAX_URLS`` URLs each, as the protocol
+    requires; the uncompressed ``sitemap.xml`` index lists all of them.
+    """
+
+    categories = (
+        (settings.FEED_CATEGORY_URL.format(slug=slug), None)
+        for slug in Category.objects.order_by("slug")
+        .values_list("slug", flat=True)
+        .iterator(chunk_size=settings.FEED_CHUNK_SIZE)
+    )
+    products = (
+        (settings.FEED_PRODUCT_URL.format(slug=slug), updated_at)
+        for slug, updated_at in Product.objects.order_by("created_at", "id")
+        .values_list("slug", "updated_at")
+        .iterator(chunk_size=settings.FEED_CHUNK_SIZE)
+    )
+    entries = chain(categories, products)
+
+    names = []
+    count = 0
+    while True:
+        chunk = list(islice(entries, settings.SITEMAP_MAX_URLS))
+        if not chunk and names:
+            break
+        name = f"sitemap-{len(names) + 1}.xml.gz"
+        with atomic_write(name) as out:
+            xml = XMLGenerator(out, encoding="utf-8")
+            xml.startDocument()
+            xml.startElement("urlset", {"xmlns": SITEMAP_NS})
+            for url, updated_at in chunk:
+                xml.startElement("url", {})
+                _element(xml, "loc", url)
+                if updated_at is not None:
+                    _element(xml, "lastmod", updated_at.date().isoformat())
+                xml.endElement("url")
+            xml.endElement("urlset")
+            xml.endDocument()
+        names.append(name)
+        count += len(chunk)
+        if len(chunk) < settings.SITEMAP_MAX_URLS:
+            break
+
+    today = timezone.now().date().isoformat()
+    with atomic_write("sitemap.xml", compress=False) as out:
+        xml = XMLGenerator(out, encoding="utf-8")
+        xml.startDocument()
+        xml.startElement("sitemapindex", {"xmlns": SITEMAP_NS})
+        for name in names:
+            xml.startElement("sitemap", {})
+            _element(xml, "loc", feed_url(name))
+            _element(xml, "lastmod", today)
+            xml.endElement("sitemap")
+        xml.endElement("sitemapindex")
+        xml.endDocument()
+    _remove_stale_sitemaps(len(names))
+    return count
+
+
+def _remove_stale_sitemaps(keep: int) -> None:
+    index = keep + 1
+    while os.path.exists(path := feed_path(f"sitemap-{index}.xml.gz")):
+        os.unlink(path)
+        index += 1
+
+
+def generate_feeds(force: bool = False) -> dict:
+    """
+    Regenerate the product feeds and sitemaps when the catalog has changed.
+
+    The latest ``updated_at``/``deleted_at`` of the catalog is stored in the
+    feed manifest; files are only rewritten when it moved since their last
+    generation, or when ``force`` is set.
+
+    Returns:
+        dict: The manifest, with one entry per generated file.
+    """
+
+    manifest = read_manifest()
+    modified_at = catalog_modified_at()
+    writers = {f"products.{fmt}.gz": fmt for fmt in FEED_FORMATS}
+    writers["sitemap.xml"] = "sitemap"
+
+    for name, kind in writers.items():
+        entry = manifest.get(name)
+        if not force and entry and entry["source_modified_at"] == modified_at:
+            continue
+        if kind == "sitemap":
+            rows = write_sitemaps()
+        else:
+            with atomic_write(name) as out:
+                rows = write_xml_feed(out) if kind == "xml" else write_csv_feed(out)
+        manifest[name] = {
+            "url": feed_url(name),
+            "rows": rows,
+            "source_modified_at": modified_at,
+            "generated_at": timezone.now().isoformat(),
+        }
+    write_manifest(manifest)
+    return manifest
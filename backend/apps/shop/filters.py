@@ -1,6 +1,9 @@
 import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
 
-from backend.apps.shop.models import Product
+from backend.apps.shop.models import PRODUCT_SEARCH_CONFIG, Product
 
 
 class ProductFilter(django_filters.FilterSet):
@@ -12,7 +15,21 @@ class ProductFilter(django_filters.FilterSet):
     )
     in_stock = django_filters.NumberFilter(lookup_expr="gte")
     created_at = django_filters.DateTimeFilter(lookup_expr="gte")
+    search = django_filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Product
-        fields = ["max_price", "min_price", "in_stock", "created_at"]
+        fields = ["max_price", "min_price", "in_stock", "created_at", "search"]
+
+    def filter_search(self, queryset, name, value):
+        query = SearchQuery(
+            value, config=PRODUCT_SEARCH_CONFIG, search_type="websearch"
+        )
+        # ts_rank is a float4; cast to float8 so the rank written into a cursor
+        # reads back as exactly the same value and ties are paged by id.
+        rank = Cast(SearchRank(F("search_vector"), query), output_field=FloatField())
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=rank)
+            .order_by("-search_rank", "id")
+        )
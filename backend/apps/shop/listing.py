@@ -0,0 +1,91 @@
+from django.db import connection, transaction
+from django.db.models import Q
+
+from backend.apps.shop.models import Product, ProductListing
+
+# ProductListing column -> Product lookup it is copied from.
+LISTING_COLUMNS = {
+    "id": "id",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "name": "name",
+    "slug": "slug",
+    "desc": "desc",
+    "price_old": "price_old",
+    "price_current": "price_current",
+    "in_stock": "in_stock",
+    "image1": "image1",
+    "image2": "image2",
+    "image3": "image3",
+    "search_vector": "search_vector",
+    "seller": "seller_id",
+    "seller_name": "seller__business_name",
+    "seller_slug": "seller__slug",
+    "seller_avatar": "seller__user__avatar",
+    "category": "category_id",
+    "category_name": "category__name",
+    "category_slug": "category__slug",
+    "category_image": "category__image",
+}
+
+# Product fields whose change has to be copied into the listing.
+LISTED_PRODUCT_FIELDS = frozenset(
+    {
+        "name",
+        "slug",
+        "desc",
+        "price_old",
+        "price_current",
+        "in_stock",
+        "image1",
+        "image2",
+        "image3",
+        "seller",
+        "category",
+        "is_deleted",
+    }
+)
+
+
+def refresh_product_listings(condition: Q) -> None:
+    """
+    Upsert the listing rows of the products matching ``condition``.
+
+    Live products are copied with a single ``INSERT ... SELECT ... ON CONFLICT``
+    built from the ORM query, soft-deleted ones are removed from the listing.
+
+    Args:
+        condition (Q): A filter on ``Product``, e.g. ``Q(seller_id=...)``.
+    """
+
+    meta = ProductListing._meta
+    columns = [meta.get_field(name).column for name in LISTING_COLUMNS]
+    live = (
+        Product.objects.filter(condition)
+        .order_by()
+        .values_list(*LISTING_COLUMNS.values())
+    )
+    select_sql, params = live.query.sql_with_params()
+    quote = connection.ops.quote_name
+    column_sql = ", ".join(quote(column) for column in columns)
+    update_sql = ", ".join(
+        f"{quote(column)} = EXCLUDED.{quote(column)}"
+        for column in columns
+        if column != "id"
+    )
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(meta.db_table)} ({column_sql}) {select_sql} "
+                f"ON CONFLICT (id) DO UPDATE SET {update_sql}",
+                params,
+            )
+        deleted = Product.objects.unfiltered().filter(condition, is_deleted=True)
+        ProductListing.objects.filter(id__in=deleted.values("id")).delete()
+
+
+def rebuild_product_listings() -> None:
+    with transaction.atomic():
+        ProductListing.objects.all().delete()
+        refresh_product_listings(Q())
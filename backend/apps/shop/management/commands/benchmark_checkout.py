@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend.apps.accounts.models import User
+from backend.apps.profiles.models import Order, OrderItem, ShippingAddress
+from backend.apps.shop.checkout import OutOfStockError, place_order
+from backend.apps.shop.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent checkouts of one hot product (a flash sale): every buyer "
+        "has it in cart and all check out at once. Reports throughput and "
+        "latency, and fails if stock was oversold. Creates and removes its own "
+        "buyers, product and category."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=500)
+        parser.add_argument("--stock", type=int, default=200)
+        parser.add_argument("--quantity", type=int, default=1)
+        parser.add_argument("--workers", type=int, default=16)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        category = Category.objects.create(name=f"Checkout benchmark {tag}")
+        product = Product.objects.create(
+            name=f"Checkout benchmark {tag}",
+            desc="Hot product of the checkout benchmark.",
+            price_current=10,
+            category=category,
+            in_stock=options["stock"],
+        )
+        users = [
+            User(
+                first_name="Buyer",
+                last_name=str(index),
+                email=f"checkout-{tag}-{index}@example.com",
+                password="!",
+            )
+            for index in range(options["buyers"])
+        ]
+        try:
+            User.objects.bulk_create(users)
+            OrderItem.objects.bulk_create(
+                OrderItem(user=user, product=product, quantity=options["quantity"])
+                for user in users
+            )
+            placed, rejected, latencies, elapsed = self.run(users, options["workers"])
+            product.refresh_from_db(fields=["in_stock"])
+            orders = Order.objects.filter(user__in=users).count()
+        finally:
+            User.objects.filter(email__startswith=f"checkout-{tag}-").delete()
+            Product.objects.unfiltered().filter(pk=product.pk).delete(hard_delete=True)
+            category.delete()
+
+        latencies.sort()
+        self.stdout.write(
+            f"{placed} orders, {rejected} rejected in {elapsed:.2f} s "
+            f"with {options['workers']} workers: "
+            f"{(placed + rejected) / elapsed:.1f} checkouts/s, "
+            f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms"
+        )
+        expected_stock = options["stock"] - placed * options["quantity"]
+        if orders != placed or product.in_stock != expected_stock:
+            raise CommandError(
+                f"Inconsistent result: {orders} orders, {product.in_stock} left, "
+                f"expected {placed} orders and {expected_stock} left"
+            )
+        if product.in_stock < 0:
+            raise CommandError(f"Oversold: {product.in_stock} left")
+        self.stdout.write(
+            self.style.SUCCESS(f"No overselling, {product.in_stock} left")
+        )
+
+    def run(self, users, workers):
+        pending = queue.SimpleQueue()
+        for user in users:
+            pending.put(user)
+        shipping = ShippingAddress(
+            full_name="Buyer",
+            email="buyer@example.com",
+            phone="0000000000",
+            address="Benchmark street 1",
+            city="Benchmark",
+            country="Benchmark",
+            zipcode="000000",
+        )
+        lock = threading.Lock()
+        counts = {"placed": 0, "rejected": 0}
+        latencies = []
+        start = threading.Barrier(workers)
+
+        def worker():
+            start.wait()
+            try:
+                while True:
+                    try:
+                        user = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        place_order(user, shipping)
+                        outcome = "placed"
+                    except OutOfStockError:
+                        outcome = "rejected"
+                    latency = time.perf_counter() - started
+                    with lock:
+                        counts[outcome] += 1
+                        latencies.append(latency)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return counts["placed"], counts["rejected"], latencies, elapsed
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from drf_orjson_renderer.renderers import ORJSONRenderer
+
+from backend.apps.shop.models import Product
+from backend.apps.shop.projections import ProductProjection
+from backend.apps.shop.serializers import ProductSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ProductSerializer with the .values() based ProductProjection "
+        "on a page of products: query + serialization + ORJSON rendering time, "
+        "and check that both produce byte-identical JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.select_related(
+            "category", "seller", "seller__user"
+        ).order_by("id")
+        rows = options["rows"]
+        renderer = ORJSONRenderer()
+
+        def serializer_path():
+            return renderer.render(ProductSerializer(list(queryset[:rows]), many=True).data)
+
+        def projection_path():
+            projection = ProductProjection()
+            return renderer.render(projection.many(projection.apply(queryset)[:rows]))
+
+        expected, actual = serializer_path(), projection_path()
+        if expected != actual:
+            raise CommandError("ProductProjection output differs from ProductSerializer")
+
+        results = {}
+        for label, path in (
+            ("ProductSerializer", serializer_path),
+            ("ProductProjection", projection_path),
+        ):
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                path()
+                timings.append(time.perf_counter() - started)
+            results[label] = min(timings) * 1000
+            self.stdout.write(
+                f"{label:<18} best {results[label]:8.2f} ms, "
+                f"mean {sum(timings) / len(timings) * 1000:8.2f} ms"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(expected)} identical bytes, "
+                f"speedup x{results['ProductSerializer'] / results['ProductProjection']:.2f}"
+            )
+        )
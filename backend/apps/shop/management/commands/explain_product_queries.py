@@ -0,0 +1,128 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from backend.apps.common.paginations import keyset_filter
+from backend.apps.shop.filters import ProductFilter
+from backend.apps.shop.mixins import PRODUCT_ORDERINGS, ProductListMixin
+from backend.apps.shop.models import Product
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN ANALYZE plans for the product listing queries. "
+        "With --compare the partial product indexes are dropped inside a "
+        "rolled back transaction to show the plans before and after them. "
+        "--compare locks shop_product while it runs; use it on a staging copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--compare", action="store_true")
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--min-price", default="100")
+        parser.add_argument("--max-price", default="1000")
+        parser.add_argument("--in-stock", default="1")
+        parser.add_argument("--created-at", default="2025-01-01T00:00:00Z")
+
+    def handle(self, *args, **options):
+        scenarios = self.build_scenarios(options)
+        if not options["compare"]:
+            self.report("current indexes", scenarios)
+            return
+
+        try:
+            with transaction.atomic():
+                self.report("with partial indexes", scenarios)
+                with connection.cursor() as cursor:
+                    for index in self.partial_indexes():
+                        cursor.execute(f'DROP INDEX "{index.name}"')
+                self.report("without partial indexes", scenarios)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def partial_indexes(self):
+        return [index for index in Product._meta.indexes if index.condition]
+
+    def build_scenarios(self, options):
+        base = ProductListMixin().get_product_queryset()
+        page_size = options["page_size"]
+
+        def filtered(**params):
+            query = QueryDict(mutable=True)
+            query.update(params)
+            return ProductFilter(query, queryset=base).qs
+
+        def cursor_page(ordering):
+            fields = PRODUCT_ORDERINGS[ordering]
+            sample = base.order_by(*fields).values_list(
+                *[field.lstrip("-") for field in fields]
+            )[page_size * 100 : page_size * 100 + 1]
+            position = list(sample[0]) if sample else None
+            qs = base
+            if position is not None:
+                qs = qs.filter(keyset_filter(fields, position))
+            return qs.order_by(*fields)[: page_size + 1]
+
+        return [
+            ("default page", lambda: base[: page_size + 1]),
+            (
+                "deep offset page",
+                lambda: base[page_size * 100 : page_size * 101 + 1],
+            ),
+            (
+                "price range",
+                lambda: filtered(
+                    min_price=options["min_price"], max_price=options["max_price"]
+                )[: page_size + 1],
+            ),
+            (
+                "in stock",
+                lambda: filtered(in_stock=options["in_stock"])[: page_size + 1],
+            ),
+            (
+                "created after",
+                lambda: filtered(created_at=options["created_at"])[: page_size + 1],
+            ),
+            ("cursor by -created_at", lambda: cursor_page("-created_at")),
+            ("cursor by price_current", lambda: cursor_page("price_current")),
+            ("filtered count", lambda: filtered(in_stock=options["in_stock"])),
+        ]
+
+    def report(self, title, scenarios):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"=== {title} ==="))
+        for label, build in scenarios:
+            queryset = build()
+            if label == "filtered count":
+                sql, params = self.count_statement(queryset)
+                started = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+                    plan = "\n".join(row[0] for row in cursor.fetchall())
+            else:
+                started = time.perf_counter()
+                plan = queryset.explain(analyze=True, buffers=True)
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(self.style.SUCCESS(f"--- {label} ({elapsed:.1f} ms)"))
+            self.stdout.write(plan)
+
+    def count_statement(self, queryset):
+        """
+        Return the ``SELECT COUNT(*)`` statement ``queryset.count()`` sends.
+        """
+
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            queryset.count()
+        return statements[-1]
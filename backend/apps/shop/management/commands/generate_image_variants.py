@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from backend.apps.common.images import generate_variants
+from backend.apps.shop.models import Category, Product
+
+IMAGE_FIELDS = {
+    Product: ("image1", "image2", "image3"),
+    Category: ("image",),
+}
+
+
+class Command(BaseCommand):
+    help = "Render the resized derivatives of existing product and category images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Re-render derivatives that already exist.",
+        )
+
+    def handle(self, *args, **options):
+        written = 0
+        for model, field_names in IMAGE_FIELDS.items():
+            for instance in model.objects.only(*field_names).iterator():
+                for field_name in field_names:
+                    image = getattr(instance, field_name)
+                    if image:
+                        written += len(
+                            generate_variants(
+                                image.storage, image.name, options["overwrite"]
+                            )
+                        )
+        self.stdout.write(self.style.SUCCESS(f"{written} image variants written"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from backend.apps.shop.feeds import generate_feeds
+
+
+class Command(BaseCommand):
+    help = "Write the product feeds and sitemaps into the media volume."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate even if the catalog has not changed.",
+        )
+
+    def handle(self, *args, **options):
+        manifest = generate_feeds(force=options["force"])
+        for name, entry in manifest.items():
+            self.stdout.write(f"{name}: {entry['rows']} rows, {entry['url']}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from backend.apps.shop.listing import rebuild_product_listings
+from backend.apps.shop.models import ProductListing
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized ProductListing read model from scratch."
+
+    def handle(self, *args, **options):
+        rebuild_product_listings()
+        self.stdout.write(
+            self.style.SUCCESS(f"{ProductListing.objects.count()} listing rows built")
+        )
@@ -0,0 +1,72 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL = """
+INSERT INTO shop_productlisting (
+    id, created_at, updated_at, name, slug, "desc", price_old, price_current,
+    in_stock, image1, image2, image3, search_vector,
+    seller_id, seller_name, seller_slug, seller_avatar,
+    category_id, category_name, category_slug, category_image
+)
+SELECT
+    p.id, p.created_at, p.updated_at, p.name, p.slug, p."desc", p.price_old, p.price_current,
+    p.in_stock, p.image1, p.image2, p.image3, p.search_vector,
+    p.seller_id, s.business_name, s.slug, u.avatar,
+    p.category_id, c.name, c.slug, c.image
+FROM shop_product p
+LEFT JOIN sellers_seller s ON s.id = p.seller_id
+LEFT JOIN accounts_user u ON u.id = s.user_id
+INNER JOIN shop_category c ON c.id = p.category_id
+WHERE NOT p.is_deleted;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('sellers', '0001_initial'),
+        ('shop', '0005_product_live_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListing',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.CharField(max_length=50)),
+                ('desc', models.TextField()),
+                ('price_old', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('price_current', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('in_stock', models.IntegerField()),
+                ('image1', models.CharField(blank=True, max_length=100)),
+                ('image2', models.CharField(blank=True, max_length=100)),
+                ('image3', models.CharField(blank=True, max_length=100)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('seller_name', models.CharField(max_length=255, null=True)),
+                ('seller_slug', models.CharField(max_length=50, null=True)),
+                ('seller_avatar', models.CharField(max_length=100, null=True)),
+                ('category_name', models.CharField(max_length=100)),
+                ('category_slug', models.CharField(max_length=50)),
+                ('category_image', models.CharField(max_length=100)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shop.category')),
+                ('seller', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='sellers.seller')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['created_at', 'id'], name='listing_created_idx'),
+                    models.Index(fields=['price_current', 'id'], name='listing_price_idx'),
+                    models.Index(fields=['in_stock', 'id'], name='listing_in_stock_idx'),
+                    models.Index(fields=['category', 'id'], name='listing_category_idx'),
+                    models.Index(fields=['seller', 'id'], name='listing_seller_idx'),
+                    django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='listing_search_vector_idx'),
+                ],
+            },
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations, models
+
+BACKFILL = """
+UPDATE shop_product AS p SET
+    rating_count = s.rating_count,
+    rating_sum = s.rating_sum,
+    rating_count_1 = s.rating_count_1,
+    rating_count_2 = s.rating_count_2,
+    rating_count_3 = s.rating_count_3,
+    rating_count_4 = s.rating_count_4,
+    rating_count_5 = s.rating_count_5,
+    average_rating = s.rating_sum::numeric / NULLIF(s.rating_count, 0)
+FROM (
+    SELECT
+        product_id,
+        count(*) AS rating_count,
+        sum(rating) AS rating_sum,
+        count(*) FILTER (WHERE rating = 1) AS rating_count_1,
+        count(*) FILTER (WHERE rating = 2) AS rating_count_2,
+        count(*) FILTER (WHERE rating = 3) AS rating_count_3,
+        count(*) FILTER (WHERE rating = 4) AS rating_count_4,
+        count(*) FILTER (WHERE rating = 5) AS rating_count_5
+    FROM shop_review
+    WHERE NOT is_deleted
+    GROUP BY product_id
+) AS s
+WHERE p.id = s.product_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_relatedproduct'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # index this way does not block writes to shop_review.
+    atomic = False
+
+    dependencies = [
+        ('shop', '0008_product_rating_counters'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['product', 'created_at', 'id'], name='review_live_product_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+import backend.apps.common.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_product_name_upper_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='slug',
+            field=backend.apps.common.fields.AllocatableSlugField(editable=False, populate_from='name', unique=True),
+        ),
+    ]
@@ -0,0 +1,169 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from backend.apps.common.paginations import KeysetPagination, PageSizedPagination
+from backend.apps.shop.counts import aget_product_count
+from backend.apps.shop.facets import aget_product_facets, parse_facets
+from backend.apps.shop.filters import ProductFilter
+from backend.apps.shop.models import Product, ProductListing
+from backend.apps.shop.projections import (
+    ProductListingProjection,
+    ProductProjection,
+    narrow_product_queryset,
+    parse_product_fields,
+)
+from backend.apps.shop.serializers import ProductSerializer
+
+PRODUCT_ORDERINGS = {
+    "created_at": ("created_at", "id"),
+    "-created_at": ("-created_at", "-id"),
+    "price_current": ("price_current", "id"),
+    "-price_current": ("-price_current", "-id"),
+}
+# Cursor ordering used for ``?search=`` when no explicit ordering is requested.
+SEARCH_ORDERING = ("-search_rank", "-id")
+
+
+class ProductListMixin:
+    """
+    Shared filtering and pagination for the async catalog list endpoints.
+
+    Views call ``list_products`` with a base queryset; ``ProductFilter`` is
+    applied on top, then the page is fetched either by page number (with a
+    cached or estimated count) or by keyset cursor when ``?cursor=`` is given.
+    ``?facets=`` adds facet aggregates computed over the same filtered rows.
+    With ``PRODUCT_VALUES_SERIALIZATION`` enabled pages are read as ``.values()``
+    rows and rendered by ``ProductProjection`` instead of ``serializer_class``.
+    ``?fields=``/``?expand=`` narrow both the output and the selected columns.
+    With ``PRODUCT_LISTING_READ_MODEL`` enabled listings are read from the flat
+    ``ProductListing`` table without any join.
+    """
+
+    serializer_class = ProductSerializer
+    pagination_class = PageSizedPagination
+    cursor_pagination_class = KeysetPagination
+    filterset_class = ProductFilter
+    projection_class = ProductProjection
+    listing_projection_class = ProductListingProjection
+
+    def get_product_queryset(self):
+        if settings.PRODUCT_LISTING_READ_MODEL:
+            return ProductListing.objects.order_by("id")
+        return Product.objects.select_related(
+            "category", "seller", "seller__user"
+        ).order_by("id")
+
+    def get_projection(self, fields):
+        if settings.PRODUCT_LISTING_READ_MODEL:
+            return self.listing_projection_class(fields)
+        if not settings.PRODUCT_VALUES_SERIALIZATION:
+            return None
+        return self.projection_class(fields)
+
+    def get_page_queryset(self, queryset, projection, fields):
+        if projection is None:
+            return narrow_product_queryset(queryset, fields)
+        return projection.apply(queryset)
+
+    def serialize_page(self, items, projection, fields):
+        if projection is None:
+            return self.serializer_class(items, many=True, fields=fields).data
+        return projection.many(items)
+
+    async def list_products(self, request, queryset, scope=""):
+        filterset = self.filterset_class(request.query_params, queryset=queryset)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        qs = filterset.qs
+
+        try:
+            fields = parse_product_fields(request.query_params)
+        except ValueError as exc:
+            return Response({"fields": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            facets = parse_facets(request.query_params.get("facets", ""))
+        except ValueError as exc:
+            return Response({"facets": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        extra = {}
+        if facets:
+            extra["facets"] = await aget_product_facets(qs, filterset, facets, scope)
+
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            return await self.get_cursor_page(request, qs, filterset, fields, extra)
+
+        paginator = self.pagination_class()
+        page_size = paginator.get_page_size(request) or 10
+
+        try:
+            page_number = int(request.query_params.get(paginator.page_query_param, 1))
+        except (ValueError, TypeError):
+            page_number = 1
+
+        total_count, count_kind = await aget_product_count(qs, filterset, scope)
+
+        projection = self.get_projection(fields)
+        page_qs = self.get_page_queryset(qs, projection, fields)
+        start = (page_number - 1) * page_size
+        end = start + page_size
+
+        # One extra row tells whether a next page exists, so the links do not
+        # depend on the count, which may be an estimate.
+        page_items = [p async for p in page_qs[start : end + 1]]
+        has_next = len(page_items) > page_size
+        page_items = page_items[:page_size]
+
+        if not page_items and page_number > 1:
+            return Response(
+                {"detail": "Invalid page."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(
+            {
+                "count": total_count,
+                "count_kind": count_kind,
+                "next": self.get_next_link(request, page_number, has_next),
+                "previous": self.get_previous_link(request, page_number),
+                "results": self.serialize_page(page_items, projection, fields),
+                **extra,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    async def get_cursor_page(self, request, queryset, filterset, fields, extra):
+        ordering = request.query_params.get("ordering")
+        if ordering is None and filterset.form.cleaned_data.get("search"):
+            ordering_fields = SEARCH_ORDERING
+        elif (ordering or "-created_at") in PRODUCT_ORDERINGS:
+            ordering_fields = PRODUCT_ORDERINGS[ordering or "-created_at"]
+        else:
+            return Response(
+                {"ordering": [f"Choose one of: {', '.join(PRODUCT_ORDERINGS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        projection = self.get_projection(fields)
+        paginator = self.cursor_pagination_class()
+        page_items = await paginator.apaginate_queryset(
+            self.get_page_queryset(queryset, projection, fields),
+            request,
+            ordering=ordering_fields,
+        )
+        data = self.serialize_page(page_items, projection, fields)
+        return Response(
+            {**paginator.get_paginated_data(data), **extra},
+            status=status.HTTP_200_OK,
+        )
+
+    def get_next_link(self, request, page_number, has_next):
+        if not has_next:
+            return None
+        url = request.build_absolute_uri()
+        return replace_query_param(url, "page", page_number + 1)
+
+    def get_previous_link(self, request, page_number):
+        if page_number <= 1:
+            return None
+        url = request.build_absolute_uri()
+        return replace_query_param(url, "page", page_number - 1)
@@ -1,8 +1,12 @@
 from autoslug import AutoSlugField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import Q
+from django.db.models.functions import Upper
 
 from backend.apps.accounts.models import User
+from backend.apps.common.fields import AllocatableSlugField
 from backend.apps.common.models import BaseModel, IsDeletedModel
 from backend.apps.sellers.models import Seller
 
@@ -14,6 +18,10 @@ RATING_CHOICES = (
     (5, 5),
 )
 
+# Text search configuration used by the ``shop_product`` search trigger.
+# The Russian configuration also stems latin words with the English stemmer.
+PRODUCT_SEARCH_CONFIG = "russian"
+
 
 class Category(BaseModel):
     """
@@ -56,13 +64,22 @@ class Product(IsDeletedModel):
         image1 (ImageField): The first image of the product.
         image2 (ImageField): The second image of the product.
         image3 (ImageField): The third image of the product.
+        average_rating (Decimal): Mean review rating, None without reviews.
+        rating_count (int): Number of live reviews.
+        rating_sum (int): Sum of the ratings of live reviews.
+        rating_count_1 .. rating_count_5 (int): Live reviews per star.
+        search_vector (SearchVectorField): Weighted name (A) and description (B)
+            lexemes, maintained by a database trigger.
+
+    The rating columns are maintained incrementally by
+    ``backend.apps.shop.ratings`` and periodically reconciled.
     """
 
     seller = models.ForeignKey(
         Seller, on_delete=models.SET_NULL, related_name="products", null=True
     )
     name = models.CharField(max_length=100)
-    slug = AutoSlugField(populate_from="name", unique=True, db_index=True)
+    slug = AllocatableSlugField(populate_from="name", unique=True, db_index=True)
     desc = models.TextField()
     price_old = models.DecimalField(max_digits=10, decimal_places=2, null=True)
     price_current = models.DecimalField(max_digits=10, decimal_places=2)
@@ -71,16 +88,177 @@ class Product(IsDeletedModel):
     )
     in_stock = models.IntegerField(default=5)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, null=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count_1 = models.PositiveIntegerField(default=0)
+    rating_count_2 = models.PositiveIntegerField(default=0)
+    rating_count_3 = models.PositiveIntegerField(default=0)
+    rating_count_4 = models.PositiveIntegerField(default=0)
+    rating_count_5 = models.PositiveIntegerField(default=0)
 
     image1 = models.ImageField(upload_to="product_images/")
     image2 = models.ImageField(upload_to="product_images/", blank=True)
     image3 = models.ImageField(upload_to="product_images/", blank=True)
 
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta(IsDeletedModel.Meta):
+        indexes = [
+            # Partial indexes over live rows only, matching the IsDeletedManager
+            # predicate plus ProductFilter ranges and the listing orderings.
+            models.Index(
+                fields=["id"],
+                name="product_live_id_idx",
+                condition=Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                name="product_live_created_idx",
+                condition=Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["price_current", "id"],
+                name="product_live_price_idx",
+                condition=Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["in_stock", "id"],
+                name="product_live_in_stock_idx",
+                condition=Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["category", "id"],
+                name="product_live_category_idx",
+                condition=Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["seller", "id"],
+                name="product_live_seller_idx",
+                condition=Q(is_deleted=False),
+            ),
+            GinIndex(fields=["search_vector"], name="product_search_vector_idx"),
+            GinIndex(
+                fields=["name"],
+                name="product_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            # Serves name__icontains, which Django renders as UPPER(name) LIKE.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="product_name_upper_trgm_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ProductListing(models.Model):
+    """
+    Denormalized read model holding one flat row per live product.
+
+    Catalog listings can be served from this single table instead of joining
+    products, sellers, users and categories. Rows are upserted by
+    ``backend.apps.shop.listing`` whenever a product, its seller, the seller's
+    avatar or its category changes, and removed when the product is deleted.
+
+    Attributes:
+        id (UUIDField): The product id.
+        seller (ForeignKey): The seller, kept after a seller is deleted until
+            the row is refreshed.
+        seller_name (str): The seller business name.
+        seller_slug (str): The seller slug.
+        seller_avatar (str): The seller user's avatar file name.
+        category (ForeignKey): The product category.
+        category_name (str): The category name.
+        category_slug (str): The category slug.
+        category_image (str): The category image file name.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    name = models.CharField(max_length=100)
+    slug = models.CharField(max_length=50)
+    desc = models.TextField()
+    price_old = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    price_current = models.DecimalField(max_digits=10, decimal_places=2)
+    in_stock = models.IntegerField()
+    image1 = models.CharField(max_length=100, blank=True)
+    image2 = models.CharField(max_length=100, blank=True)
+    image3 = models.CharField(max_length=100, blank=True)
+    search_vector = SearchVectorField(null=True)
+
+    seller = models.ForeignKey(
+        Seller,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        null=True,
+    )
+    seller_name = models.CharField(max_length=255, null=True)
+    seller_slug = models.CharField(max_length=50, null=True)
+    seller_avatar = models.CharField(max_length=100, null=True)
+
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+    category_name = models.CharField(max_length=100)
+    category_slug = models.CharField(max_length=50)
+    category_image = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="listing_created_idx"),
+            models.Index(fields=["price_current", "id"], name="listing_price_idx"),
+            models.Index(fields=["in_stock", "id"], name="listing_in_stock_idx"),
+            models.Index(fields=["category", "id"], name="listing_category_idx"),
+            models.Index(fields=["seller", "id"], name="listing_seller_idx"),
+            GinIndex(fields=["search_vector"], name="listing_search_vector_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
 
+class RelatedProduct(models.Model):
+    """
+    A "frequently bought together" neighbour of a product.
+
+    Rebuilt offline by ``backend.apps.shop.recommendations`` from completed
+    orders; only the top ``RELATED_PRODUCTS_TOP_K`` neighbours are kept. The
+    ``(product, rank)`` primary key doubles as the index the related products
+    endpoint reads.
+
+    Attributes:
+        product (ForeignKey): The product the recommendation is for.
+        rank (int): Position of the neighbour, starting at 1.
+        related (ForeignKey): The product bought together with it.
+        score (int): Number of completed orders containing both products.
+    """
+
+    pk = models.CompositePrimaryKey("product_id", "rank")
+    # The primary key already indexes product_id.
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="co_purchases", db_index=False
+    )
+    rank = models.PositiveSmallIntegerField()
+    related = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="co_purchased_from"
+    )
+    score = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.product_id} #{self.rank}: {self.related_id}"
+
+
 class Review(IsDeletedModel):
+    """
+    A user's rating and review of a product.
+
+    ``counted_rating`` remembers what the stored row contributes to the
+    product rating columns so that a save can apply just the difference.
+    """
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reviews")
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="reviews"
@@ -96,3 +274,26 @@ class Review(IsDeletedModel):
                 condition=Q(is_deleted=False),
             )
         ]
+        indexes = [
+            # Per-product review pages, newest first (keyset on created_at, id).
+            models.Index(
+                fields=["product", "created_at", "id"],
+                name="review_live_product_idx",
+                condition=Q(is_deleted=False),
+            ),
+        ]
+
+    # (product_id, rating) counted in the product aggregates, None if none.
+    counted_rating = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {"product_id", "rating", "is_deleted"}.issubset(field_names):
+            instance.counted_rating = instance.get_counted_rating()
+        return instance
+
+    def get_counted_rating(self):
+        if self.is_deleted:
+            return None
+        return self.product_id, self.rating
@@ -0,0 +1,237 @@
+from backend.apps.common.images import variant_urls
+from backend.apps.shop.models import Category, Product
+from backend.apps.shop.ratings import RATING_SUMMARY_FIELDS
+from backend.apps.shop.serializers import ProductSerializer
+
+PRODUCT_FIELDS = (
+    "seller",
+    "name",
+    "slug",
+    "desc",
+    "price_old",
+    "price_current",
+    "category",
+    "in_stock",
+    "image1",
+    "image2",
+    "image3",
+    "image1_srcset",
+)
+# The product detail additionally renders the rating summary.
+PRODUCT_DETAIL_FIELDS = (*PRODUCT_FIELDS, "rating")
+# Nested objects that are only fetched (and joined) when selected.
+PRODUCT_RELATIONS = ("seller", "category")
+# Columns every listing needs for ordering and keyset cursors.
+PRODUCT_KEY_COLUMNS = ("id", "created_at", "price_current")
+
+
+def _split(value):
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def parse_product_fields(
+    query_params, allowed=PRODUCT_FIELDS
+) -> tuple[str, ...] | None:
+    """
+    Resolve ``?fields=`` and ``?expand=`` into the product fields to render.
+
+    ``fields`` lists the wanted top level fields out of ``allowed``, ``expand``
+    the nested ``seller``/``category`` objects to add. When only ``expand`` is
+    given all scalar fields are kept.
+
+    Returns:
+        tuple[str, ...] | None: Selected fields in serializer order, or None
+        when neither parameter is present (the full representation).
+
+    Raises:
+        ValueError: If an unknown field or relation is requested.
+    """
+
+    if "fields" not in query_params and "expand" not in query_params:
+        return None
+    if "fields" in query_params:
+        fields = _split(query_params.get("fields"))
+    else:
+        fields = [name for name in allowed if name not in PRODUCT_RELATIONS]
+    expand = _split(query_params.get("expand"))
+
+    unknown = [name for name in fields if name not in allowed]
+    unknown += [name for name in expand if name not in PRODUCT_RELATIONS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+
+    selected = {*fields, *expand}
+    return tuple(name for name in allowed if name in selected)
+
+
+ONLY_COLUMNS = {
+    "seller": (
+        "seller",
+        "seller__business_name",
+        "seller__slug",
+        "seller__user",
+        "seller__user__avatar",
+    ),
+    "category": ("category", "category__name", "category__slug", "category__image"),
+    "image1_srcset": ("image1",),
+    "rating": RATING_SUMMARY_FIELDS,
+}
+
+
+def narrow_product_queryset(queryset, fields):
+    """
+    Restrict a product queryset to the columns and joins ``fields`` needs.
+    """
+
+    if fields is None:
+        return queryset
+    related = []
+    if "seller" in fields:
+        related += ["seller", "seller__user"]
+    if "category" in fields:
+        related.append("category")
+    columns = list(PRODUCT_KEY_COLUMNS)
+    for name in fields:
+        columns.extend(ONLY_COLUMNS.get(name, (name,)))
+    return queryset.select_related(None).select_related(*related).only(*columns)
+
+
+class ProductProjection:
+    """
+    Renders products from ``.values()`` rows instead of model instances.
+
+    The output is identical to ``ProductSerializer`` (same keys, order and
+    formatting) but skips model instantiation and the per-row serializer
+    machinery: scalar formatting is delegated to the serializer's own field
+    instances and image URLs are built straight from the stored file names.
+    Only the columns of the selected ``fields`` are queried.
+    """
+
+    values_columns = {
+        "seller": (
+            "seller_id",
+            "seller__business_name",
+            "seller__slug",
+            "seller__user__avatar",
+        ),
+        "category": ("category__name", "category__slug", "category__image"),
+        "image1_srcset": ("image1",),
+    }
+    column_map = {}
+
+    def __init__(self, fields=None):
+        self.fields = fields or PRODUCT_FIELDS
+        serializer_fields = ProductSerializer().fields
+        self.price_old = serializer_fields["price_old"].to_representation
+        self.price_current = serializer_fields["price_current"].to_representation
+        self.product_storage = Product._meta.get_field("image1").storage
+        self.category_storage = Category._meta.get_field("image").storage
+        key = self.key
+        self.seller_keys = [key(lookup) for lookup in self.values_columns["seller"]]
+        self.category_keys = [key(lookup) for lookup in self.values_columns["category"]]
+        self.builders = {
+            "seller": self.seller,
+            "name": self.column(key("name")),
+            "slug": self.column(key("slug")),
+            "desc": self.column(key("desc")),
+            "price_old": self.decimal_column(self.price_old, key("price_old")),
+            "price_current": self.decimal_column(
+                self.price_current, key("price_current")
+            ),
+            "category": self.category,
+            "in_stock": self.column(key("in_stock")),
+            "image1": self.image_column(self.product_storage, key("image1")),
+            "image2": self.image_column(self.product_storage, key("image2")),
+            "image3": self.image_column(self.product_storage, key("image3")),
+            "image1_srcset": self.srcset_column(self.product_storage, key("image1")),
+        }
+
+    def key(self, lookup):
+        """
+        Name of the selected column that holds ``lookup`` in the source table.
+        """
+
+        return self.column_map.get(lookup, lookup)
+
+    def get_values_fields(self, queryset) -> list[str]:
+        """
+        Columns to select, including annotations the pagination orders by.
+        """
+
+        columns = dict.fromkeys(PRODUCT_KEY_COLUMNS)
+        for name in self.fields:
+            lookups = self.values_columns.get(name, (name,))
+            columns.update(dict.fromkeys(self.key(lookup) for lookup in lookups))
+        extra = [name for name in ("search_rank",) if name in queryset.query.annotations]
+        return [*columns, *extra]
+
+    def apply(self, queryset):
+        return queryset.values(*self.get_values_fields(queryset))
+
+    def to_representation(self, row) -> dict:
+        return {name: self.builders[name](row) for name in self.fields}
+
+    def many(self, rows) -> list[dict]:
+        return [self.to_representation(row) for row in rows]
+
+    @staticmethod
+    def column(name):
+        return lambda row: row[name]
+
+    @staticmethod
+    def decimal_column(to_representation, name):
+        def build(row):
+            value = row[name]
+            if value is None:
+                return None
+            return to_representation(value)
+
+        return build
+
+    def image_column(self, storage, name):
+        return lambda row: self.image(storage, row[name])
+
+    @staticmethod
+    def srcset_column(storage, name):
+        return lambda row: variant_urls(storage, row[name])
+
+    def seller(self, row):
+        seller_id, name, slug, avatar = self.seller_keys
+        if row[seller_id] is None:
+            return None
+        return {
+            "name": row[name],
+            "slug": row[slug],
+            # SellerShopSerializer renders the avatar FieldFile with str().
+            "avatar": row[avatar] or "",
+        }
+
+    def category(self, row):
+        name, slug, image = self.category_keys
+        return {
+            "name": row[name],
+            "slug": row[slug],
+            "image": self.image(self.category_storage, row[image]),
+            "image_srcset": variant_urls(self.category_storage, row[image]),
+        }
+
+    @staticmethod
+    def image(storage, name):
+        if not name:
+            return None
+        return storage.url(name)
+
+
+class ProductListingProjection(ProductProjection):
+    """
+    ``ProductProjection`` over the flat ``ProductListing`` read model.
+    """
+
+    column_map = {
+        "seller__business_name": "seller_name",
+        "seller__slug": "seller_slug",
+        "seller__user__avatar": "seller_avatar",
+        "category__name": "category_name",
+        "category__slug": "category_slug",
+        "category__image": "category_image",
+    }
@@ -0,0 +1,118 @@
+from collections import Counter
+from functools import partial
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import DecimalField, F
+from django.db.models.functions import Cast, NullIf
+
+from backend.apps.shop.models import RATING_CHOICES, Product
+
+RATING_STARS = [star for star, _ in RATING_CHOICES]
+RATING_HISTOGRAM_FIELDS = {star: f"rating_count_{star}" for star in RATING_STARS}
+# Product columns a rating summary is rendered from.
+RATING_SUMMARY_FIELDS = (
+    "average_rating",
+    "rating_count",
+    *RATING_HISTOGRAM_FIELDS.values(),
+)
+RATING_SUMMARY_CACHE_KEY = "shop:rating-summary:{slug}"
+
+RECONCILE_SQL = """
+UPDATE shop_product AS p SET
+    rating_count = s.rating_count,
+    rating_sum = s.rating_sum,
+    {histogram_set},
+    average_rating = s.rating_sum::numeric / NULLIF(s.rating_count, 0)
+FROM (
+    SELECT
+        p2.id,
+        count(r.id) AS rating_count,
+        coalesce(sum(r.rating), 0) AS rating_sum,
+        {histogram_select}
+    FROM shop_product AS p2
+    LEFT JOIN shop_review AS r ON r.product_id = p2.id AND NOT r.is_deleted
+    GROUP BY p2.id
+) AS s
+WHERE p.id = s.id AND (
+    (p.rating_count, p.rating_sum, {histogram_current})
+        IS DISTINCT FROM (s.rating_count, s.rating_sum, {histogram_expected})
+    OR p.average_rating
+        IS DISTINCT FROM round(s.rating_sum::numeric / NULLIF(s.rating_count, 0), 2)
+)
+"""
+
+
+def apply_rating_change(old, new) -> None:
+    """
+    Move a review's contribution from ``old`` to ``new`` in the product rows.
+
+    Both are ``(product_id, rating)`` pairs or None. The counters are changed
+    with ``F()`` expressions, so concurrent reviews never overwrite each other,
+    and the average is recomputed from the same row in the same ``UPDATE``.
+    """
+
+    if old == new:
+        return
+    deltas = {}
+    for pair, sign in ((old, -1), (new, 1)):
+        if pair is not None:
+            product_id, rating = pair
+            deltas.setdefault(product_id, Counter())[rating] += sign
+    for product_id, delta in deltas.items():
+        if any(delta.values()):
+            _update_product(product_id, delta)
+    transaction.on_commit(partial(invalidate_rating_summaries, list(deltas)))
+
+
+def invalidate_rating_summaries(product_ids) -> None:
+    slugs = Product.objects.unfiltered().filter(pk__in=product_ids).values_list(
+        "slug", flat=True
+    )
+    cache.delete_many([RATING_SUMMARY_CACHE_KEY.format(slug=slug) for slug in slugs])
+
+
+def _update_product(product_id, delta: Counter) -> None:
+    count = sum(delta.values())
+    total = sum(star * n for star, n in delta.items())
+    updates = {
+        "rating_count": F("rating_count") + count,
+        "rating_sum": F("rating_sum") + total,
+        # SET expressions read the row before the update, hence the deltas.
+        "average_rating": Cast(
+            F("rating_sum") + total, DecimalField(max_digits=12, decimal_places=2)
+        )
+        / NullIf(F("rating_count") + count, 0),
+    }
+    for star, n in delta.items():
+        if n:
+            field = RATING_HISTOGRAM_FIELDS[star]
+            updates[field] = F(field) + n
+    Product.objects.unfiltered().filter(pk=product_id).update(**updates)
+
+
+def reconcile_ratings() -> int:
+    """
+    Recompute the rating columns from the reviews where they have drifted.
+
+    Drift can come from writes that bypass the signals (queryset updates or
+    deletes, raw SQL). Everything is recomputed in one ``UPDATE`` statement
+    that only touches rows whose stored values differ.
+
+    Returns:
+        int: Number of products corrected.
+    """
+
+    fields = list(RATING_HISTOGRAM_FIELDS.values())
+    sql = RECONCILE_SQL.format(
+        histogram_set=", ".join(f"{field} = s.{field}" for field in fields),
+        histogram_select=", ".join(
+            f"count(r.id) FILTER (WHERE r.rating = {star}) AS {field}"
+            for star, field in RATING_HISTOGRAM_FIELDS.items()
+        ),
+        histogram_current=", ".join(f"p.{field}" for field in fields),
+        histogram_expected=", ".join(f"s.{field}" for field in fields),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.rowcount
@@ -0,0 +1,93 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from backend.apps.profiles.models import OrderItem
+from backend.apps.shop.models import RelatedProduct
+
+# Orders whose items count as bought together.
+COMPLETED_PAYMENT_STATUS = "SUCCESSFUL"
+
+
+def order_product_matrix():
+    """
+    Build the binary order x product incidence matrix of completed orders.
+
+    Returns:
+        tuple: The CSR matrix and the product ids of its columns.
+    """
+
+    pairs = (
+        OrderItem.objects.filter(
+            order__payment_status=COMPLETED_PAYMENT_STATUS,
+            product__is_deleted=False,
+        )
+        .values_list("order_id", "product_id")
+        .iterator(chunk_size=settings.RELATED_PRODUCTS_CHUNK_SIZE)
+    )
+    orders, products = {}, {}
+    rows, cols = [], []
+    for order_id, product_id in pairs:
+        rows.append(orders.setdefault(order_id, len(orders)))
+        cols.append(products.setdefault(product_id, len(products)))
+
+    data = np.ones(len(rows), dtype=np.int32)
+    matrix = sparse.csr_matrix(
+        (data, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+        shape=(len(orders), len(products)),
+    )
+    # The same product may appear in several items of one order.
+    matrix.data[:] = 1
+    return matrix, list(products)
+
+
+def top_neighbours(matrix, top_k: int):
+    """
+    Yield ``(product, [(neighbour, count), ...])`` column indexes by count.
+
+    The product x product co-occurrence counts are ``Mᵀ·M`` without its
+    diagonal; ties are broken by the neighbour index for stable output.
+    """
+
+    co_occurrence = (matrix.T @ matrix).tocsr()
+    co_occurrence.setdiag(0)
+    co_occurrence.eliminate_zeros()
+    for product in range(co_occurrence.shape[0]):
+        start, end = co_occurrence.indptr[product], co_occurrence.indptr[product + 1]
+        if start == end:
+            continue
+        neighbours = co_occurrence.indices[start:end]
+        counts = co_occurrence.data[start:end]
+        if len(counts) > top_k:
+            keep = np.argpartition(-counts, top_k - 1)[:top_k]
+            neighbours, counts = neighbours[keep], counts[keep]
+        order = np.lexsort((neighbours, -counts))
+        yield product, list(zip(neighbours[order].tolist(), counts[order].tolist()))
+
+
+def rebuild_related_products() -> int:
+    """
+    Recompute the "frequently bought together" table from completed orders.
+
+    Returns:
+        int: Number of rows written.
+    """
+
+    matrix, product_ids = order_product_matrix()
+    rows = [
+        RelatedProduct(
+            product_id=product_ids[product],
+            rank=rank,
+            related_id=product_ids[neighbour],
+            score=count,
+        )
+        for product, neighbours in top_neighbours(
+            matrix, settings.RELATED_PRODUCTS_TOP_K
+        )
+        for rank, (neighbour, count) in enumerate(neighbours, 1)
+    ]
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        RelatedProduct.objects.bulk_create(rows, batch_size=5000)
+    return len(rows)
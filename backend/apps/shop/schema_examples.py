@@ -3,7 +3,25 @@ from drf_spectacular.utils import OpenApiParameter
 
 from backend.core import settings
 
+PRODUCT_FIELDS_PARAM_EXAMPLE = [
+    OpenApiParameter(
+        name="fields",
+        description="Comma separated product fields to return, e.g. "
+        "`name,slug,price_current,image1`. Unlisted columns are not queried",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="expand",
+        description="Comma separated nested objects to include with `fields`: "
+        "`seller`, `category`. Relations that are not expanded are not joined",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+]
+
 PRODUCT_PARAM_EXAMPLE = [
+    *PRODUCT_FIELDS_PARAM_EXAMPLE,
     OpenApiParameter(
         name="max_price",
         description="Filter products by MAX current price",
@@ -28,6 +46,20 @@ PRODUCT_PARAM_EXAMPLE = [
         required=False,
         type=OpenApiTypes.DATE,
     ),
+    OpenApiParameter(
+        name="search",
+        description="Full-text search over product name and description. "
+        "Results are ordered by relevance",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="facets",
+        description="Comma separated facets to aggregate over the filtered products: "
+        "`price`, `category`, `in_stock`",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
     OpenApiParameter(
         name="page",
         description="Retrieve a particular page. Defaults to 1",
@@ -40,4 +72,34 @@ PRODUCT_PARAM_EXAMPLE = [
         required=False,
         type=OpenApiTypes.INT,
     ),
+    OpenApiParameter(
+        name="cursor",
+        description="Opaque keyset cursor. Pass an empty value for the first page; "
+        "the response then contains `next`/`previous` cursors instead of `count`",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="ordering",
+        description="Cursor mode ordering. Defaults to relevance with `search`, "
+        "otherwise to `-created_at`",
+        required=False,
+        type=OpenApiTypes.STR,
+        enum=["created_at", "-created_at", "price_current", "-price_current"],
+    ),
+]
+
+CURSOR_PAGE_PARAMS = [
+    OpenApiParameter(
+        name="cursor",
+        description="Opaque cursor from a next/previous link",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="page_size",
+        description="Items per page",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
 ]
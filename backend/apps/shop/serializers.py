@@ -1,14 +1,33 @@
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from backend.apps.common.images import variant_urls
 from backend.apps.profiles.serializers import ShippingAddressSerializer
 from backend.apps.shop.models import Review
+from backend.apps.shop.ratings import RATING_HISTOGRAM_FIELDS
+
+
+@extend_schema_field(
+    {"type": "object", "additionalProperties": {"type": "string"}, "nullable": True}
+)
+class ImageVariantsField(serializers.Field):
+    """
+    Renders an image field as a ``{width: url}`` map of its derivatives.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(value.storage, value.name)
 
 
 class CategorySerializer(serializers.Serializer):
     name = serializers.CharField()
     slug = serializers.SlugField(read_only=True)
     image = serializers.ImageField()
+    image_srcset = ImageVariantsField(source="image")
 
 
 class SellerShopSerializer(serializers.Serializer):
@@ -17,7 +36,19 @@ class SellerShopSerializer(serializers.Serializer):
     avatar = serializers.CharField(source="user.avatar")
 
 
-class ProductSerializer(serializers.Serializer):
+class SparseFieldsMixin:
+    """
+    Accepts ``fields=`` to render only a subset of the declared fields.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.Serializer):
     seller = SellerShopSerializer()
     name = serializers.CharField()
     slug = serializers.SlugField()
@@ -29,6 +60,47 @@ class ProductSerializer(serializers.Serializer):
     image1 = serializers.ImageField()
     image2 = serializers.ImageField(required=False)
     image3 = serializers.ImageField(required=False)
+    image1_srcset = ImageVariantsField(source="image1")
+
+
+class ProductRatingSerializer(serializers.Serializer):
+    average = serializers.DecimalField(
+        max_digits=3, decimal_places=2, source="average_rating"
+    )
+    count = serializers.IntegerField(source="rating_count")
+    histogram = serializers.SerializerMethodField()
+
+    @extend_schema_field(
+        {"type": "object", "additionalProperties": {"type": "integer"}}
+    )
+    def get_histogram(self, obj):
+        return {
+            str(star): getattr(obj, field)
+            for star, field in RATING_HISTOGRAM_FIELDS.items()
+        }
+
+
+class ProductDetailSerializer(ProductSerializer):
+    rating = ProductRatingSerializer(source="*")
+
+
+class ReviewAuthorSerializer(serializers.Serializer):
+    name = serializers.CharField(source="full_name")
+    avatar = serializers.ImageField()
+
+
+class ProductReviewSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    author = ReviewAuthorSerializer(source="user")
+    rating = serializers.IntegerField()
+    text = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+
+class ProductSuggestSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    slug = serializers.SlugField()
+    image = serializers.ImageField(source="image1")
 
 
 class CreateProductSerializer(serializers.Serializer):
@@ -59,11 +131,29 @@ class OrderItemSerializer(serializers.Serializer):
     )
 
 
+class CartSummarySerializer(serializers.Serializer):
+    items = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
 class ToggleCartItemSerializer(serializers.Serializer):
     slug = serializers.SlugField()
     quantity = serializers.IntegerField(min_value=0)
 
 
+class CartItemsBatchListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        slugs = [item["slug"] for item in attrs]
+        if len(set(slugs)) != len(slugs):
+            raise serializers.ValidationError("Every slug may appear only once.")
+        return attrs
+
+
+class CartItemsBatchSerializer(ToggleCartItemSerializer):
+    class Meta:
+        list_serializer_class = CartItemsBatchListSerializer
+
+
 class CheckoutSerializer(serializers.Serializer):
     shipping_id = serializers.UUIDField()
 
@@ -77,12 +167,8 @@ class OrderSerializer(serializers.Serializer):
     payment_status = serializers.CharField()
     date_delivered = serializers.DateTimeField()
     shipping_details = serializers.SerializerMethodField()
-    subtotal = serializers.DecimalField(
-        max_digits=100, decimal_places=2, source="get_cart_subtotal"
-    )
-    total = serializers.DecimalField(
-        max_digits=100, decimal_places=2, source="get_cart_total"
-    )
+    subtotal = serializers.DecimalField(max_digits=100, decimal_places=2)
+    total = serializers.DecimalField(max_digits=100, decimal_places=2)
 
     @extend_schema_field(ShippingAddressSerializer)
     def get_shipping_details(self, obj):
@@ -92,6 +178,7 @@ class OrderSerializer(serializers.Serializer):
 class CheckItemOrderSerializer(serializers.Serializer):
     product = ProductSerializer()
     quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
     total = serializers.FloatField(source="get_total")
 
 
@@ -1,16 +1,100 @@
 from django.db import transaction
+from django.db.models import Q
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from backend.apps.shop.models import Review
-from backend.apps.shop.tasks import calculate_average_rating
+from backend.apps.accounts.models import User
+from backend.apps.sellers.models import Seller
+from backend.apps.shop.listing import LISTED_PRODUCT_FIELDS, refresh_product_listings
+from backend.apps.shop.models import Category, Product, ProductListing, Review
+from backend.apps.shop.ratings import apply_rating_change
+from backend.apps.shop.tasks import (
+    generate_image_variants,
+    refresh_product_listing,
+)
+
+PRODUCT_IMAGE_FIELDS = ["image1", "image2", "image3"]
+CATEGORY_IMAGE_FIELDS = ["image"]
 
 
 @receiver(post_save, sender=Review)
-def calculate_avg_rating_on_save(sender, instance, **kwargs):
-    transaction.on_commit(lambda: calculate_average_rating.delay(instance.product_id))
+def update_rating_on_save(sender, instance, **kwargs):
+    counted_rating = instance.get_counted_rating()
+    apply_rating_change(instance.counted_rating, counted_rating)
+    instance.counted_rating = counted_rating
 
 
 @receiver(post_delete, sender=Review)
-def calculate_avg_rating_on_delete(sender, instance, **kwargs):
-    transaction.on_commit(lambda: calculate_average_rating.delay(instance.product_id))
+def update_rating_on_delete(sender, instance, **kwargs):
+    apply_rating_change(instance.counted_rating, None)
+    instance.counted_rating = None
+
+
+@receiver(post_save, sender=Product)
+def refresh_listing_on_product_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not LISTED_PRODUCT_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(lambda: refresh_product_listings(Q(pk=instance.pk)))
+
+
+@receiver(post_delete, sender=Product)
+def drop_listing_on_product_delete(sender, instance, **kwargs):
+    ProductListing.objects.filter(id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Seller)
+def refresh_listing_on_seller_save(sender, instance, **kwargs):
+    seller_id = str(instance.pk)
+    transaction.on_commit(
+        lambda: refresh_product_listing.delay_coalesced(seller_id=seller_id)
+    )
+
+
+@receiver(post_delete, sender=Seller)
+def detach_listing_on_seller_delete(sender, instance, **kwargs):
+    # Mirrors Product.seller's SET_NULL, which does not send product signals.
+    ProductListing.objects.filter(seller_id=instance.pk).update(
+        seller=None, seller_name=None, seller_slug=None, seller_avatar=None
+    )
+
+
+@receiver(post_save, sender=Category)
+def refresh_listing_on_category_save(sender, instance, **kwargs):
+    category_id = str(instance.pk)
+    transaction.on_commit(
+        lambda: refresh_product_listing.delay_coalesced(category_id=category_id)
+    )
+
+
+@receiver(post_save, sender=User)
+def refresh_listing_on_avatar_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields and "avatar" not in update_fields:
+        return
+    if instance.account_type != "SELLER":
+        return
+    user_id = str(instance.pk)
+    transaction.on_commit(
+        lambda: refresh_product_listing.delay_coalesced(seller__user_id=user_id)
+    )
+
+
+def enqueue_image_variants(instance, field_names, update_fields):
+    if update_fields:
+        field_names = [name for name in field_names if name in update_fields]
+    if not field_names:
+        return
+    model_label = instance._meta.label
+    pk = str(instance.pk)
+    transaction.on_commit(
+        lambda: generate_image_variants.delay_coalesced(model_label, pk, field_names)
+    )
+
+
+@receiver(post_save, sender=Product)
+def generate_product_image_variants(sender, instance, update_fields=None, **kwargs):
+    enqueue_image_variants(instance, PRODUCT_IMAGE_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=Category)
+def generate_category_image_variants(sender, instance, update_fields=None, **kwargs):
+    enqueue_image_variants(instance, CATEGORY_IMAGE_FIELDS, update_fields)
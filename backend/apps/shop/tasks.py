@@ -1,15 +1,76 @@
 from celery import shared_task
-from django.db.models import Avg
+from django.apps import apps
+from django.db.models import Q
 
 
-from backend.apps.shop.models import Product
+from backend.apps.common.coalescing import CoalescingTask
+from backend.apps.common.images import generate_variants
+from backend.apps.shop.feeds import generate_feeds
+from backend.apps.shop.listing import refresh_product_listings
+from backend.apps.shop.ratings import reconcile_ratings
+from backend.apps.shop.recommendations import rebuild_related_products
 
 
 @shared_task
-def calculate_average_rating(product_id: int) -> float:
-    product = Product.objects.get(pk=product_id)
-    result = product.reviews.aggregate(avg=Avg("rating"))
-    rating = result.get("avg", 0.0)
-    product.average_rating = rating
-    product.save(update_fields=["average_rating"])
-    return rating
+def reconcile_product_ratings() -> int:
+    """
+    Fix any drift of the incrementally maintained product rating columns.
+    """
+    return reconcile_ratings()
+
+
+@shared_task(base=CoalescingTask)
+def refresh_product_listing(**lookups) -> None:
+    """
+    Refresh the listing rows of all products matching ``lookups``.
+
+    Used for changes that fan out to many products (a seller, a category or
+    a seller's avatar), e.g.
+    ``refresh_product_listing.delay_coalesced(seller_id=...)``.
+    """
+    refresh_product_listings(Q(**lookups))
+
+
+@shared_task(base=CoalescingTask)
+def generate_image_variants(
+    model_label: str, pk: str, field_names: list[str]
+) -> list[str]:
+    """
+    Render the resized derivatives of the given image fields of one instance.
+
+    Args:
+        model_label (str): The model, e.g. ``"shop.Product"``.
+        pk (str): The instance primary key.
+        field_names (list[str]): Image fields to process.
+
+    Returns:
+        list[str]: Storage names of the derivatives written.
+    """
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return []
+    written = []
+    for field_name in field_names:
+        image = getattr(instance, field_name)
+        if image:
+            written += generate_variants(image.storage, image.name)
+    return written
+
+
+@shared_task
+def generate_product_feeds(force: bool = False) -> dict:
+    """
+    Rebuild the marketplace feeds and sitemaps if the catalog changed.
+
+    Scheduled by celery beat (``CELERY_BEAT_SCHEDULE``).
+    """
+    return generate_feeds(force=force)
+
+
+@shared_task
+def build_related_products() -> int:
+    """
+    Nightly rebuild of the "frequently bought together" recommendations.
+    """
+    return rebuild_related_products()
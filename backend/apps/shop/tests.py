@@ -1 +1,291 @@
-# Create your tests here.
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from backend.apps.accounts.models import User
+from backend.apps.profiles.models import Order, OrderItem, ShippingAddress
+from backend.apps.shop.carts import get_cart_storage
+from backend.apps.shop.checkout import (
+    EmptyCartError,
+    OutOfStockError,
+    checkout_lock,
+    place_order,
+)
+from backend.apps.shop.counts import aestimate_count
+from backend.apps.shop.models import Category, Product
+
+
+class EstimateCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Phones")
+        Product.objects.bulk_create(
+            Product(
+                name=f"Phone {index}",
+                slug=f"phone-{index}",
+                desc="A phone.",
+                price_current=100,
+                category=category,
+                in_stock=index % 2,
+            )
+            for index in range(200)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE shop_product")
+
+    async def test_estimate_is_close_to_the_row_count(self):
+        queryset = Product.objects.filter(in_stock__gt=0)
+        estimate = await aestimate_count(queryset)
+        actual = await queryset.acount()
+        self.assertEqual(actual, 100)
+        self.assertAlmostEqual(estimate, actual, delta=actual * 0.2)
+
+
+class SearchCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Lamps")
+        # Same name and description, so every product has the same rank.
+        cls.products = [
+            Product.objects.create(
+                name="Desk lamp",
+                desc="A lamp with a warm light.",
+                price_current=100,
+                category=category,
+            )
+            for _ in range(7)
+        ]
+
+    def test_cursor_pages_products_of_equal_rank_once_each(self):
+        client = APIClient()
+        response = client.get(
+            "/shop/products/", {"search": "lamp", "cursor": "", "page_size": 2}
+        )
+        slugs = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            slugs += [product["slug"] for product in response.data["results"]]
+            if response.data["next"] is None:
+                break
+            response = client.get(response.data["next"])
+
+        self.assertEqual(len(slugs), len(self.products))
+        self.assertCountEqual(slugs, [product.slug for product in self.products])
+
+
+def create_shipping(user) -> ShippingAddress:
+    return ShippingAddress.objects.create(
+        user=user,
+        full_name="Buyer One",
+        email=user.email,
+        phone="0000000000",
+        address="Main street 1",
+        city="City",
+        country="Country",
+        zipcode="000000",
+    )
+
+
+class CheckoutViewTests(TestCase):
+    url = "/shop/checkout/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            "Buyer", "One", "buyer@example.com", "password"
+        )
+        cls.shipping = create_shipping(cls.user)
+        category = Category.objects.create(name="Lamps")
+        cls.product = Product.objects.create(
+            name="Desk lamp",
+            desc="A lamp.",
+            price_current=10,
+            category=category,
+            in_stock=5,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def checkout(self):
+        return self.client.post(
+            self.url, {"shipping_id": str(self.shipping.id)}, format="json"
+        )
+
+    def test_shortages_are_a_conflict_and_nothing_is_ordered(self):
+        OrderItem.objects.create(user=self.user, product=self.product, quantity=6)
+
+        response = self.checkout()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["in_stock"], {self.product.slug: 5})
+        self.assertFalse(Order.objects.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.in_stock, 5)
+        self.assertTrue(OrderItem.objects.filter(user=self.user, order=None).exists())
+
+    def test_empty_cart_is_not_found(self):
+        response = self.checkout()
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Order.objects.exists())
+
+    @override_settings(CART_STORAGE="backend.apps.shop.carts.CacheCartStorage")
+    def test_overlapping_checkout_of_a_cached_cart_is_rejected(self):
+        cart = get_cart_storage(self.user)
+        cart.set_quantity(self.product.slug, 2)
+
+        with checkout_lock(self.user):
+            response = self.checkout()
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+        response = self.checkout()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(cart.get_items(), [])
+
+
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            "Buyer", "One", "buyer@example.com", "password"
+        )
+        cls.shipping = create_shipping(cls.user)
+        category = Category.objects.create(name="Lamps")
+        cls.lamp = Product.objects.create(
+            name="Desk lamp",
+            desc="A lamp.",
+            price_current=10,
+            category=category,
+            in_stock=5,
+        )
+        cls.bulb = Product.objects.create(
+            name="Bulb", desc="A bulb.", price_current=2, category=category
+        )
+
+    def add_to_cart(self, product, quantity):
+        return OrderItem.objects.create(
+            user=self.user, product=product, quantity=quantity
+        )
+
+    def test_stock_is_reserved_and_prices_are_frozen(self):
+        self.add_to_cart(self.lamp, 2)
+        self.add_to_cart(self.bulb, 3)
+
+        order = place_order(self.user, self.shipping)
+        Product.objects.filter(pk=self.lamp.pk).update(price_current=99)
+
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.in_stock, 3)
+        order.refresh_from_db()
+        self.assertEqual(order.subtotal, 26)
+        self.assertEqual(order.total, 26)
+        prices = dict(order.orderitems.values_list("product_id", "unit_price"))
+        self.assertEqual(prices, {self.lamp.pk: 10, self.bulb.pk: 2})
+        self.assertFalse(OrderItem.objects.filter(user=self.user, order=None).exists())
+
+    def test_stock_cannot_go_below_zero(self):
+        self.add_to_cart(self.lamp, 5)
+        place_order(self.user, self.shipping)
+        self.add_to_cart(self.lamp, 1)
+
+        with self.assertRaises(OutOfStockError) as raised:
+            place_order(self.user, self.shipping)
+        self.assertEqual(raised.exception.shortages, {self.lamp.slug: 0})
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.in_stock, 0)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_deleted_products_are_out_of_stock(self):
+        self.add_to_cart(self.lamp, 1)
+        self.add_to_cart(self.bulb, 1)
+        self.bulb.delete()
+
+        with self.assertRaises(OutOfStockError) as raised:
+            place_order(self.user, self.shipping)
+        self.assertEqual(raised.exception.shortages, {self.bulb.slug: 0})
+        self.assertFalse(Order.objects.exists())
+
+    def test_empty_cart_raises(self):
+        with self.assertRaises(EmptyCartError):
+            place_order(self.user, self.shipping)
+
+    def test_rows_added_during_the_checkout_stay_in_the_cart(self):
+        self.add_to_cart(self.lamp, 1)
+        added = []
+
+        def add_row(execute, sql, params, many, context):
+            # Another request adds a product once the cart rows are locked.
+            if not added and "UPDATE shop_product AS p" in sql:
+                added.append(self.add_to_cart(self.bulb, 1))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(add_row):
+            order = place_order(self.user, self.shipping)
+
+        self.assertEqual(order.subtotal, 10)
+        self.assertEqual(
+            list(order.orderitems.values_list("product_id", flat=True)),
+            [self.lamp.pk],
+        )
+        added[0].refresh_from_db()
+        self.assertIsNone(added[0].order_id)
+
+
+class PlaceOrderConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        # Transactions commit here, which would hand listing refreshes to Celery.
+        for target in (
+            "backend.apps.shop.checkout.refresh_product_listing",
+            "backend.apps.shop.signals.refresh_product_listing",
+        ):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_concurrent_checkouts_never_oversell(self):
+        category = Category.objects.create(name="Lamps")
+        lamp = Product.objects.create(
+            name="Desk lamp",
+            desc="A lamp.",
+            price_current=10,
+            category=category,
+            in_stock=5,
+        )
+        buyers = []
+        for index in range(4):
+            user = User.objects.create_user(
+                "Buyer", str(index), f"buyer-{index}@example.com", "password"
+            )
+            OrderItem.objects.create(user=user, product=lamp, quantity=2)
+            buyers.append((user, create_shipping(user)))
+
+        outcomes = []
+        start = threading.Barrier(len(buyers))
+
+        def checkout(user, shipping):
+            start.wait()
+            try:
+                place_order(user, shipping)
+                outcomes.append("placed")
+            except OutOfStockError:
+                outcomes.append("rejected")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout, args=buyer) for buyer in buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ["placed", "placed", "rejected", "rejected"])
+        lamp.refresh_from_db()
+        self.assertEqual(lamp.in_stock, 1)
+        self.assertEqual(Order.objects.count(), 2)
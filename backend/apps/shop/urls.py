@@ -6,9 +6,15 @@ from backend.apps.shop.views import (
     ProductsByCategoryView,
     ProductsBySellerView,
     ProductsView,
+    ProductSuggestView,
     ProductView,
+    ProductRelatedView,
+    ProductReviewsView,
     CartView,
+    CartBatchView,
+    CartSummaryView,
     CheckoutView,
+    CheckoutTicketView,
     ReviewsViewSet,
 )
 
@@ -20,8 +26,14 @@ urlpatterns = [
     path("categories/<slug:slug>/", ProductsByCategoryView.as_view()),
     path("sellers/<slug:slug>/", ProductsBySellerView.as_view()),
     path("products/", ProductsView.as_view()),
+    path("products/suggest/", ProductSuggestView.as_view()),
     path("products/<slug:slug>/", ProductView.as_view()),
+    path("products/<slug:slug>/related/", ProductRelatedView.as_view()),
+    path("products/<slug:slug>/reviews/", ProductReviewsView.as_view()),
     path("cart/", CartView.as_view()),
+    path("cart/batch/", CartBatchView.as_view()),
+    path("cart/summary/", CartSummaryView.as_view()),
     path("checkout/", CheckoutView.as_view()),
+    path("checkout/<uuid:ticket>/", CheckoutTicketView.as_view()),
     path("", include(router.urls)),
 ]
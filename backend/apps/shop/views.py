@@ -1,21 +1,54 @@
-from drf_spectacular.utils import extend_schema
+import uuid
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.db.models import Q
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from adrf.views import APIView as AsyncAPIView
 
-from backend.apps.common.paginations import PageSizedPagination
-from backend.apps.profiles.models import OrderItem, Order, ShippingAddress
+from backend.apps.common.cache import LRUCache
+from backend.apps.common.paginations import KeysetPagination
+from backend.apps.profiles.models import ShippingAddress
 from backend.apps.sellers.models import Seller
-from backend.apps.shop.filters import ProductFilter
+from backend.apps.shop.carts import get_cart_storage
+from backend.apps.profiles.tasks import place_queued_order
+from backend.apps.shop.checkout import (
+    CHECKOUT_TICKET_CACHE_KEY,
+    CheckoutInProgressError,
+    EmptyCartError,
+    OutOfStockError,
+    checkout_cart,
+    save_ticket,
+)
+from backend.apps.shop.mixins import ProductListMixin
 from backend.apps.shop.models import Category, Product, Review
-from backend.apps.shop.schema_examples import PRODUCT_PARAM_EXAMPLE
+from backend.apps.shop.projections import (
+    PRODUCT_DETAIL_FIELDS,
+    narrow_product_queryset,
+    parse_product_fields,
+)
+from backend.apps.shop.ratings import RATING_SUMMARY_CACHE_KEY, RATING_SUMMARY_FIELDS
+from backend.apps.shop.schema_examples import (
+    CURSOR_PAGE_PARAMS,
+    PRODUCT_FIELDS_PARAM_EXAMPLE,
+    PRODUCT_PARAM_EXAMPLE,
+)
 from backend.apps.shop.serializers import (
+    CartItemsBatchSerializer,
+    CartSummarySerializer,
     CategorySerializer,
+    ProductDetailSerializer,
+    ProductRatingSerializer,
+    ProductReviewSerializer,
     ProductSerializer,
+    ProductSuggestSerializer,
     OrderItemSerializer,
     ToggleCartItemSerializer,
     OrderSerializer,
@@ -25,6 +58,11 @@ from backend.apps.shop.serializers import (
 
 tags = ["shop"]
 
+suggest_cache = LRUCache(
+    maxsize=settings.PRODUCT_SUGGEST_CACHE_SIZE,
+    timeout=settings.PRODUCT_SUGGEST_CACHE_TIMEOUT,
+)
+
 
 class CategoriesView(APIView):
     serializer_class = CategorySerializer
@@ -58,9 +96,7 @@ class CategoriesView(APIView):
             return Response(serializer.errors, status=400)
 
 
-class ProductsByCategoryView(APIView):
-    serializer_class = ProductSerializer
-
+class ProductsByCategoryView(ProductListMixin, AsyncAPIView):
     @extend_schema(
         operation_id="category_products",
         summary="Category Products Fetch",
@@ -68,145 +104,253 @@ class ProductsByCategoryView(APIView):
             This endpoint returns all products in a particular category.
         """,
         tags=tags,
+        parameters=PRODUCT_PARAM_EXAMPLE,
     )
-    def get(self, request, *args, **kwargs):
-        category = Category.objects.get_or_none(slug=kwargs["slug"])
+    async def get(self, request, *args, **kwargs):
+        category = await Category.objects.aget_or_none(slug=kwargs["slug"])
         if not category:
             return Response(
                 data={"message": "Category does not exist!"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        products = Product.objects.select_related(
-            "category", "seller", "seller__user"
-        ).filter(category=category)
-        serializer = self.serializer_class(products, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
-
+        products = self.get_product_queryset().filter(category=category)
+        return await self.list_products(
+            request, products, scope=f"category:{category.pk}"
+        )
 
-class ProductsView(AsyncAPIView):
-    serializer_class = ProductSerializer
-    pagination_class = PageSizedPagination
 
+class ProductsView(ProductListMixin, AsyncAPIView):
     @extend_schema(
         operation_id="all_products",
         summary="Product Fetch",
         description="""
             This endpoint returns all products.
+            `count_kind` tells whether `count` is exact or a planner estimate.
+            Pass `cursor` (empty for the first page) to switch to keyset pagination:
+            the response then has opaque `next`/`previous` cursors and no `count`.
         """,
         tags=tags,
         parameters=PRODUCT_PARAM_EXAMPLE,
     )
     async def get(self, request, *args, **kwargs):
-        queryset = (
-            Product.objects.select_related("category", "seller", "seller__user")
-            .order_by("id")
-            .all()
-        )
+        return await self.list_products(request, self.get_product_queryset())
 
-        filterset = ProductFilter(request.query_params, queryset=queryset)
-        if not filterset.is_valid():
-            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
-        qs = filterset.qs
 
-        paginator = self.pagination_class()
-        page_size = paginator.get_page_size(request) or 10
+class ProductSuggestView(AsyncAPIView):
+    serializer_class = ProductSuggestSerializer
 
+    @extend_schema(
+        operation_id="product_suggest",
+        summary="Product Autocomplete",
+        description="""
+            This endpoint returns the best matching product names for search-as-you-type.
+            Matching is typo tolerant (trigram word similarity on the product name).
+        """,
+        tags=tags,
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                description="The text typed so far",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="limit",
+                description=f"How many suggestions to return. Defaults to {settings.PRODUCT_SUGGEST_LIMIT}",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ],
+        responses=ProductSuggestSerializer(many=True),
+    )
+    async def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
         try:
-            page_number = int(request.query_params.get(paginator.page_query_param, 1))
+            limit = int(request.query_params.get("limit", settings.PRODUCT_SUGGEST_LIMIT))
         except (ValueError, TypeError):
-            page_number = 1
-
-        total_count = await qs.acount()
-
-        start = (page_number - 1) * page_size
-        end = start + page_size
-
-        if start >= total_count > 0:
-            return Response(
-                {"detail": "Invalid page."}, status=status.HTTP_404_NOT_FOUND
+            limit = settings.PRODUCT_SUGGEST_LIMIT
+        limit = max(1, min(limit, settings.PRODUCT_SUGGEST_MAX_LIMIT))
+        if not query:
+            return Response(data=[], status=status.HTTP_200_OK)
+
+        cache_key = (query.lower(), limit)
+        cacheable = len(query) <= settings.PRODUCT_SUGGEST_CACHE_PREFIX_LENGTH
+        if cacheable:
+            data = suggest_cache.get(cache_key)
+            if data is not None:
+                return Response(data=data, status=status.HTTP_200_OK)
+
+        products = (
+            Product.objects.filter(
+                Q(name__icontains=query) | Q(name__trigram_word_similar=query)
             )
-
-        page_items = [p async for p in qs[start:end]]
-
-        serializer = self.serializer_class(page_items, many=True)
-
-        return Response(
-            {
-                "count": total_count,
-                "next": self.get_next_link(
-                    request, page_number, total_count, page_size
-                ),
-                "previous": self.get_previous_link(request, page_number),
-                "results": serializer.data,
-            },
-            status=status.HTTP_200_OK,
+            .annotate(similarity=TrigramWordSimilarity(query, "name"))
+            .order_by("-similarity", "name")
+            .only("name", "slug", "image1")[:limit]
         )
-
-    def get_next_link(self, request, page_number, total_count, page_size):
-        if (page_number * page_size) >= total_count:
-            return None
-        url = request.build_absolute_uri()
-        return replace_query_param(url, "page", page_number + 1)
-
-    def get_previous_link(self, request, page_number):
-        if page_number <= 1:
-            return None
-        url = request.build_absolute_uri()
-        return replace_query_param(url, "page", page_number - 1)
+        serializer = self.serializer_class([p async for p in products], many=True)
+        data = serializer.data
+        if cacheable:
+            suggest_cache.set(cache_key, data)
+        return Response(data=data, status=status.HTTP_200_OK)
 
 
-class ProductsBySellerView(APIView):
-    serializer_class = ProductSerializer
-
+class ProductsBySellerView(ProductListMixin, AsyncAPIView):
     @extend_schema(
         summary="Seller Products Fetch",
         description="""
             This endpoint returns all products in a particular seller.
         """,
         tags=tags,
+        parameters=PRODUCT_PARAM_EXAMPLE,
     )
-    def get(self, request, *args, **kwargs):
-        seller = Seller.objects.get_or_none(slug=kwargs["slug"])
+    async def get(self, request, *args, **kwargs):
+        seller = await Seller.objects.aget_or_none(slug=kwargs["slug"])
         if not seller:
             return Response(
                 data={"message": "Seller does not exist!"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        products = Product.objects.select_related(
-            "category", "seller", "seller__user"
-        ).filter(seller=seller)
-        serializer = self.serializer_class(products, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        products = self.get_product_queryset().filter(seller=seller)
+        return await self.list_products(
+            request, products, scope=f"seller:{seller.pk}"
+        )
 
 
 class ProductView(APIView):
-    serializer_class = ProductSerializer
+    serializer_class = ProductDetailSerializer
 
-    def get_object(self, slug):
-        product = Product.objects.get_or_none(slug=slug)
+    def get_object(self, slug, fields=None):
+        queryset = Product.objects.select_related("category", "seller", "seller__user")
+        product = narrow_product_queryset(queryset, fields).get_or_none(slug=slug)
         return product
 
     @extend_schema(
         operation_id="product_detail",
         summary="Product Details Fetch",
         description="""
-            This endpoint returns the details for a product via the slug.
+            This endpoint returns the details for a product via the slug,
+            including its rating summary (average, count and per-star
+            histogram).
         """,
         tags=tags,
+        parameters=PRODUCT_FIELDS_PARAM_EXAMPLE,
     )
     def get(self, request, *args, **kwargs):
-        product = self.get_object(kwargs["slug"])
+        try:
+            fields = parse_product_fields(
+                request.query_params, allowed=PRODUCT_DETAIL_FIELDS
+            )
+        except ValueError as exc:
+            return Response({"fields": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        product = self.get_object(kwargs["slug"], fields)
         if not product:
             return Response(
                 data={"message": "Product does not exist!"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        serializer = self.serializer_class(product)
+        serializer = self.serializer_class(product, fields=fields)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
+
+class ProductRelatedView(APIView):
+    serializer_class = ProductSerializer
+
+    @extend_schema(
+        operation_id="product_related",
+        summary="Frequently Bought Together",
+        description="""
+            This endpoint returns the products most often bought together with
+            the product, best match first. Recommendations are rebuilt nightly
+            from completed orders.
+        """,
+        tags=tags,
+        parameters=PRODUCT_FIELDS_PARAM_EXAMPLE,
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = parse_product_fields(request.query_params)
+        except ValueError as exc:
+            return Response({"fields": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = (
+            Product.objects.select_related("category", "seller", "seller__user")
+            .filter(co_purchased_from__product__slug=kwargs["slug"])
+            .order_by("co_purchased_from__rank")
+        )
+        products = list(narrow_product_queryset(queryset, fields))
+        if not products and not Product.objects.filter(slug=kwargs["slug"]).exists():
+            return Response(
+                data={"message": "Product does not exist!"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = self.serializer_class(products, many=True, fields=fields)
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
+class ProductReviewsView(AsyncAPIView):
+    serializer_class = ProductReviewSerializer
+    pagination_class = KeysetPagination
+
+    @extend_schema(
+        operation_id="product_reviews",
+        summary="Product Reviews Fetch",
+        description="""
+            This endpoint returns the reviews of a product, newest first, with
+            cursor pagination (follow the next/previous links) and the
+            product's rating summary.
+        """,
+        tags=tags,
+        parameters=CURSOR_PAGE_PARAMS,
+    )
+    async def get(self, request, *args, **kwargs):
+        summary_key = RATING_SUMMARY_CACHE_KEY.format(slug=kwargs["slug"])
+        summary = await cache.aget(summary_key)
+        if summary is None:
+            product = await Product.objects.only(
+                "id", *RATING_SUMMARY_FIELDS
+            ).aget_or_none(slug=kwargs["slug"])
+            if not product:
+                return Response(
+                    data={"message": "Product does not exist!"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            summary = {
+                "product_id": product.id,
+                "rating": dict(ProductRatingSerializer(product).data),
+            }
+            await cache.aset(
+                summary_key, summary, settings.RATING_SUMMARY_CACHE_TIMEOUT
+            )
+
+        reviews = (
+            Review.objects.filter(product_id=summary["product_id"])
+            .select_related("user")
+            .only(
+                "id",
+                "rating",
+                "text",
+                "created_at",
+                "user",
+                "user__first_name",
+                "user__last_name",
+                "user__avatar",
+            )
+        )
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(reviews, request)
+        serializer = self.serializer_class(page, many=True)
+        return Response(
+            data={
+                "rating": summary["rating"],
+                **paginator.get_paginated_data(serializer.data),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class CartView(APIView):
     serializer_class = OrderItemSerializer
+    permission_classes = [IsAuthenticated]
 
     @extend_schema(
         summary="Cart Items Fetch",
@@ -216,77 +360,115 @@ class CartView(APIView):
         tags=tags,
     )
     def get(self, request, *args, **kwargs):
-        user = request.user
-        orderitems = OrderItem.objects.filter(user=user, order=None).select_related(
-            "product", "product__seller", "product__seller__user"
-        )
-        serializer = self.serializer_class(orderitems, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        items = get_cart_storage(request.user).get_items()
+        return Response(data=items, status=status.HTTP_200_OK)
 
     @extend_schema(
         summary="Toggle Item in cart",
         description="""
-            This endpoint allows a user or guest to add/update/remove an item in cart.
+            This endpoint allows a user to add/update/remove an item in cart.
             If quantity is 0, the item is removed from cart
         """,
         tags=tags,
         request=ToggleCartItemSerializer,
     )
     def post(self, request, *args, **kwargs):
-        user = request.user
         serializer = ToggleCartItemSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        quantity = data["quantity"]
 
-        product = Product.objects.select_related("seller", "seller__user").get_or_none(
-            slug=data["slug"]
+        result = get_cart_storage(request.user).set_quantity(
+            data["slug"], data["quantity"]
         )
-        if not product:
+        if result is None:
             return Response({"message": "No Product with that slug"}, status=404)
-        orderitem, created = OrderItem.objects.update_or_create(
-            user=user,
-            order=None,
-            product=product,
-            defaults={"quantity": quantity},
-        )
+        data, created = result
         resp_message_substring = "Updated In"
         status_code = status.HTTP_200_OK
         if created:
             status_code = status.HTTP_201_CREATED
             resp_message_substring = "Added To"
-        if orderitem.quantity == 0:
+        if data is None:
             resp_message_substring = "Removed From"
-            orderitem.delete()
-            data = None
-        if resp_message_substring != "Removed From":
-            serializer = self.serializer_class(orderitem)
-            data = serializer.data
         return Response(
             data={"message": f"Item {resp_message_substring} Cart", "item": data},
             status=status_code,
         )
 
 
+class CartBatchView(APIView):
+    serializer_class = CartItemsBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Batch update cart",
+        description="""
+            This endpoint allows a user to add/update/remove many cart items
+            at once from a list of {slug, quantity} items, e.g. to restore
+            a saved cart. A quantity of 0 removes the item. All changes are
+            applied in one transaction; the response holds the resulting cart
+            and the slugs of products that do not exist.
+        """,
+        tags=tags,
+        request=CartItemsBatchSerializer(many=True),
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(
+            data=request.data,
+            many=True,
+            min_length=1,
+            max_length=settings.CART_BATCH_MAX_ITEMS,
+        )
+        serializer.is_valid(raise_exception=True)
+        quantities = {
+            item["slug"]: item["quantity"] for item in serializer.validated_data
+        }
+
+        cart = get_cart_storage(request.user)
+        not_found = cart.set_quantities(quantities)
+        return Response(
+            data={"items": cart.get_items(), "not_found": not_found},
+            status=status.HTTP_200_OK,
+        )
+
+
+class CartSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Cart Summary",
+        description="""
+            This endpoint returns the number of items in the user cart and its
+            subtotal, for the header badge. It is served from the cache.
+        """,
+        tags=tags,
+        responses=CartSummarySerializer,
+    )
+    def get(self, request, *args, **kwargs):
+        summary = get_cart_storage(request.user).get_summary()
+        return Response(data=summary, status=status.HTTP_200_OK)
+
+
 class CheckoutView(APIView):
     serializer_class = CheckoutSerializer
+    permission_classes = [IsAuthenticated]
 
     @extend_schema(
         summary="Checkout",
         description="""
                This endpoint allows a user to create an order through which payment can then be made through.
+               Stock is reserved atomically; if some items exceed the stock left,
+               nothing is ordered and the stock left per slug is returned (409).
+               A checkout made while another one of the same cart runs is
+               rejected (409).
+               With CHECKOUT_MODE "queue" the order is placed by a worker instead:
+               the response is 202 with a ticket to poll at checkout/<ticket>/.
                """,
         tags=tags,
         request=CheckoutSerializer,
     )
     def post(self, request, *args, **kwargs):
         user = request.user
-        orderitems = OrderItem.objects.filter(user=user, order=None)
-        if not orderitems.exists():
-            return Response(
-                {"message": "No Items in Cart"}, status=status.HTTP_404_NOT_FOUND
-            )
-
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
@@ -298,22 +480,21 @@ class CheckoutView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        fields_to_update = [
-            "full_name",
-            "email",
-            "phone",
-            "address",
-            "city",
-            "country",
-            "zipcode",
-        ]
-        data = {}
-        for field in fields_to_update:
-            value = getattr(shipping, field)
-            data[field] = value
-
-        order = Order.objects.create(user=user, **data)
-        orderitems.update(order=order)
+        cart = get_cart_storage(user)
+        if settings.CHECKOUT_MODE == "queue":
+            return self.enqueue(user, cart, shipping)
+
+        try:
+            order = checkout_cart(cart, shipping)
+        except EmptyCartError as exc:
+            return Response({"message": str(exc)}, status=status.HTTP_404_NOT_FOUND)
+        except OutOfStockError as exc:
+            return Response(
+                {"message": str(exc), "in_stock": exc.shortages},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except CheckoutInProgressError as exc:
+            return Response({"message": str(exc)}, status=status.HTTP_409_CONFLICT)
 
         serializer = OrderSerializer(order)
         return Response(
@@ -321,6 +502,41 @@ class CheckoutView(APIView):
             status=status.HTTP_200_OK,
         )
 
+    def enqueue(self, user, cart, shipping):
+        if not cart.get_summary()["items"]:
+            return Response(
+                {"message": "No Items in Cart"}, status=status.HTTP_404_NOT_FOUND
+            )
+        ticket = str(uuid.uuid4())
+        save_ticket(ticket, user.pk, "QUEUED")
+        place_queued_order.delay(ticket, str(user.pk), str(shipping.id))
+        return Response(
+            data={"message": "Checkout Queued", "ticket": ticket},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class CheckoutTicketView(AsyncAPIView):
+    @extend_schema(
+        summary="Queued Checkout Status",
+        description="""
+            This endpoint returns the status of a queued checkout: QUEUED,
+            PLACED (with the order tx_ref) or FAILED (with the reason). It is
+            served from the cache and meant to be polled.
+        """,
+        tags=tags,
+    )
+    async def get(self, request, *args, **kwargs):
+        ticket = await cache.aget(
+            CHECKOUT_TICKET_CACHE_KEY.format(ticket=kwargs["ticket"])
+        )
+        if not ticket or ticket.pop("user_id") != str(request.user.pk):
+            return Response(
+                data={"message": "No checkout with that ticket"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(data=ticket, status=status.HTTP_200_OK)
+
 
 class ReviewsViewSet(ModelViewSet):
     serializer_class = ReviewSerializer
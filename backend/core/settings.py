@@ -14,6 +14,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
 from django.core.management.utils import get_random_secret_key
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -35,6 +36,12 @@ AUTH_USER_MODEL = "accounts.User"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Fixed-width derivatives rendered for uploaded product and category images.
+IMAGE_VARIANT_WIDTHS = (160, 320, 640, 1280)
+# Any format Pillow can write, e.g. "AVIF" with an AVIF enabled Pillow build.
+IMAGE_VARIANT_FORMAT = "WEBP"
+IMAGE_VARIANT_QUALITY = 80
+
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
@@ -54,6 +61,113 @@ CELERY_BROKER_URL = (
 )
 CELERY_RESULT_BACKEND = "rpc://"
 CELERY_RESULT_PERSISTENT = True
+# Identical coalesced tasks (CoalescingTask.delay_coalesced) issued within
+# this many seconds run once.
+TASK_COALESCE_WINDOW = 5
+# How long a pending marker survives a backed up queue before calls go through.
+TASK_COALESCE_MAX_DELAY = 10 * 60
+# Queued checkouts run on their own queue, served by the celery_checkout
+# worker whose concurrency bounds the checkouts running at once.
+CELERY_TASK_ROUTES = {
+    "backend.apps.profiles.tasks.place_queued_order": {"queue": "checkout"},
+}
+CELERY_BEAT_SCHEDULE = {
+    "generate-product-feeds": {
+        "task": "backend.apps.shop.tasks.generate_product_feeds",
+        "schedule": 60 * 60,
+    },
+    "build-related-products": {
+        "task": "backend.apps.shop.tasks.build_related_products",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "reconcile-product-ratings": {
+        "task": "backend.apps.shop.tasks.reconcile_product_ratings",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
+
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Exact product counts are cached per normalized filter set for this many seconds.
+PRODUCT_COUNT_CACHE_TIMEOUT = 60
+# Above this planner estimate the listing returns the estimate instead of COUNT(*).
+PRODUCT_COUNT_ESTIMATE_THRESHOLD = 10_000
+
+# Render catalog listings from .values() rows (ProductProjection) instead of
+# ProductSerializer; the JSON output is identical.
+PRODUCT_VALUES_SERIALIZATION = True
+# Serve catalog listings from the denormalized ProductListing table.
+PRODUCT_LISTING_READ_MODEL = bool(os.environ.get("PRODUCT_LISTING_READ_MODEL", False))
+
+# Upper bounds of the price facet buckets; the last bucket is open-ended.
+PRODUCT_PRICE_FACET_EDGES = (1000, 5000, 10000, 50000)
+PRODUCT_FACET_CACHE_TIMEOUT = 60
+
+PRODUCT_SUGGEST_LIMIT = 8
+PRODUCT_SUGGEST_MAX_LIMIT = 20
+# Suggestions for queries up to this length are kept in a per-process LRU.
+PRODUCT_SUGGEST_CACHE_PREFIX_LENGTH = 3
+PRODUCT_SUGGEST_CACHE_SIZE = 1024
+PRODUCT_SUGGEST_CACHE_TIMEOUT = 60
+
+# Bulk product imports up to this size are processed within the request,
+# larger ones are handed to a Celery worker and polled for progress.
+PRODUCT_IMPORT_SYNC_MAX_BYTES = 256 * 1024
+PRODUCT_IMPORT_CHUNK_SIZE = 500
+PRODUCT_IMPORT_MAX_ERRORS = 1000
+# Maximum number of rows accepted by one bulk price/stock update.
+PRODUCT_BULK_UPDATE_MAX_ROWS = 50_000
+# Cart storage backend: DatabaseCartStorage keeps carts as open OrderItem rows,
+# CacheCartStorage keeps them in the cache until checkout.
+CART_STORAGE = os.environ.get(
+    "CART_STORAGE", "backend.apps.shop.carts.DatabaseCartStorage"
+)
+CART_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+# The database cart summary follows product prices, which change without
+# touching carts, so it is only cached briefly.
+CART_SUMMARY_CACHE_TIMEOUT = 60
+# Maximum number of items accepted by one batch cart update.
+CART_BATCH_MAX_ITEMS = 200
+# "sync" places orders within the checkout request, "queue" hands them to the
+# checkout Celery queue and answers 202 with a ticket to poll.
+CHECKOUT_MODE = os.environ.get("CHECKOUT_MODE", "sync")
+CHECKOUT_TICKET_TIMEOUT = 24 * 60 * 60
+# Upper bound on one checkout of a cart; the per-user checkout lock expires
+# after it in case the process holding it dies.
+CHECKOUT_LOCK_TIMEOUT = 60
+
+# Rating summaries shown above product review pages.
+RATING_SUMMARY_CACHE_TIMEOUT = 5 * 60
+
+# "Frequently bought together" neighbours kept per product.
+RELATED_PRODUCTS_TOP_K = 10
+RELATED_PRODUCTS_CHUNK_SIZE = 10_000
+
+# Public product feeds and sitemaps, written under MEDIA_ROOT/FEED_DIR.
+SITE_URL = os.environ.get("SITE_URL", "http://localhost")
+FEED_DIR = "feeds"
+FEED_TITLE = "Product catalog"
+FEED_CURRENCY = "RUB"
+FEED_PRODUCT_URL = SITE_URL + "/products/{slug}/"
+FEED_CATEGORY_URL = SITE_URL + "/categories/{slug}/"
+FEED_CHUNK_SIZE = 2000
+SITEMAP_MAX_URLS = 50_000
+# Rows fetched per round trip by the streaming seller exports.
+EXPORT_CHUNK_SIZE = 2000
 
 
 # Application definition
@@ -65,6 +179,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_filters",
     "rest_framework",
     "drf_spectacular",